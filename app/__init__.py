@@ -17,6 +17,9 @@ def create_app():
 
     db.init_app(app)
 
+    from .storage import init_storage
+    init_storage(app, db)
+
     from .routes import main_bp
     app.register_blueprint(main_bp)
 
@@ -0,0 +1,189 @@
+import multiprocessing
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from typing import Dict, List, Sequence, Set, Tuple
+import numpy as np
+from .scrape.market_data import date_ordinals, pack_series, score_windows
+
+
+# Plain rows handed to the scorer, so partitions can be pickled to worker
+# processes without ORM objects or an app context. symbol is the market
+# symbol the investment's company resolved to, or None.
+InvestmentRow = namedtuple("InvestmentRow", "id politician_id date sector_mask symbol")
+PolicyRow = namedtuple("PolicyRow", "id politician_id date sector_mask")
+ScoringSettings = namedtuple(
+    "ScoringSettings", "threshold window_days as_of last_investment_id last_policy_id open_since"
+)
+
+Series = Tuple[List, List[float]]
+
+
+def score_correlations(
+    investments: Sequence[InvestmentRow],
+    policies: Sequence[PolicyRow],
+    existing: Set[Tuple[int, int]],
+    series: Dict[str, Series],
+    settings: ScoringSettings,
+    workers: int = 1,
+) -> List[dict]:
+    """Correlation rows for every pending pair whose window return clears the threshold.
+
+    With more than one worker, politicians are split into balanced
+    partitions scored on a process pool. Rows come back in (politician,
+    investment, policy) order either way.
+    """
+    if workers <= 1:
+        return score_partition(investments, policies, existing, series, settings)
+
+    partitions = partition_by_politician(investments, policies, workers)
+    if len(partitions) <= 1:
+        return score_partition(investments, policies, existing, series, settings)
+
+    rows = []
+    # spawn rather than fork, like the PDF extractor: the parent may hold
+    # database connections and HTTP pool locks
+    with ProcessPoolExecutor(
+        max_workers=len(partitions), mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        futures = []
+        for part_investments, part_policies in partitions:
+            investment_ids = {inv.id for inv in part_investments}
+            symbols = {inv.symbol for inv in part_investments if inv.symbol}
+            futures.append(
+                pool.submit(
+                    score_partition,
+                    part_investments,
+                    part_policies,
+                    {pair for pair in existing if pair[0] in investment_ids},
+                    {symbol: series[symbol] for symbol in symbols if symbol in series},
+                    settings,
+                )
+            )
+        for future in futures:
+            rows.extend(future.result())
+
+    rows.sort(key=lambda row: (row["politician_id"], row["investment_id"], row["policy_id"]))
+    return rows
+
+
+def score_partition(
+    investments: Sequence[InvestmentRow],
+    policies: Sequence[PolicyRow],
+    existing: Set[Tuple[int, int]],
+    series: Dict[str, Series],
+    settings: ScoringSettings,
+) -> List[dict]:
+    window = timedelta(days=settings.window_days)
+    pairs = []
+    for inv, pol in candidate_pairs(investments, policies, settings.window_days):
+        if not inv.symbol or (inv.id, pol.id) in existing:
+            continue
+        if not _is_pending(inv, pol, settings):
+            continue
+        # Same test as keyword_category_match, on the masks stored at ingest
+        if inv.sector_mask & pol.sector_mask:
+            pairs.append((inv, pol))
+
+    symbols = sorted({inv.symbol for inv, _ in pairs})
+    symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+    keys, closes, segment_starts = pack_series([series.get(symbol, ([], [])) for symbol in symbols])
+    returns = score_windows(
+        keys,
+        closes,
+        segment_starts,
+        np.fromiter((symbol_index[inv.symbol] for inv, _ in pairs), dtype=np.int64, count=len(pairs)),
+        date_ordinals([pol.date for _, pol in pairs]),
+        date_ordinals([pol.date + window for _, pol in pairs]),
+        as_of=settings.as_of,
+    )
+
+    rows = []
+    # NaN (no price data) never passes the threshold
+    for i in np.flatnonzero(returns >= settings.threshold):
+        inv, pol = pairs[i]
+        price_change = float(returns[i])
+        rows.append(
+            {
+                "politician_id": inv.politician_id,
+                "investment_id": inv.id,
+                "policy_id": pol.id,
+                "suspicion_score": price_change,
+                "details": f"Price gain {price_change:.2%} within {settings.window_days} days of policy vote",
+            }
+        )
+    return rows
+
+
+def candidate_pairs(investments, policies, window_days: int):
+    """Pair each investment with the same politician's policies dated
+    within window_days of it.
+
+    Policies are sorted by date once per politician and each investment
+    binary-searches its window, instead of comparing every investment with
+    every policy. Pairs come back in (politician, investment, policy) id
+    order, the order the per-politician nested loop produced them in.
+    """
+    window = timedelta(days=window_days)
+    policies_by_politician = defaultdict(list)
+    for pol in policies:
+        policies_by_politician[pol.politician_id].append(pol)
+
+    dates_by_politician = {}
+    for politician_id, pols in policies_by_politician.items():
+        pols.sort(key=lambda p: p.date)
+        dates_by_politician[politician_id] = [p.date for p in pols]
+
+    pairs = []
+    for inv in investments:
+        dates = dates_by_politician.get(inv.politician_id)
+        if not dates:
+            continue
+        pols = policies_by_politician[inv.politician_id]
+        start = bisect_left(dates, inv.date - window)
+        stop = bisect_right(dates, inv.date + window)
+        pairs.extend((inv, pol) for pol in pols[start:stop])
+
+    pairs.sort(key=lambda pair: (pair[0].politician_id, pair[0].id, pair[1].id))
+    return pairs
+
+
+def partition_by_politician(
+    investments: Sequence[InvestmentRow], policies: Sequence[PolicyRow], partitions: int
+) -> List[Tuple[List[InvestmentRow], List[PolicyRow]]]:
+    """Split rows into at most `partitions` groups of whole politicians.
+
+    Politicians are assigned largest first to the lightest group, weighted
+    by investments times policies, which bounds their candidate pairs.
+    """
+    investments_by_politician = defaultdict(list)
+    policies_by_politician = defaultdict(list)
+    for inv in investments:
+        investments_by_politician[inv.politician_id].append(inv)
+    for pol in policies:
+        policies_by_politician[pol.politician_id].append(pol)
+
+    # Only politicians with both kinds of row can produce pairs
+    politician_ids = [pid for pid in investments_by_politician if pid in policies_by_politician]
+    weights = {
+        pid: len(investments_by_politician[pid]) * len(policies_by_politician[pid]) for pid in politician_ids
+    }
+    groups = [([], [], 0) for _ in range(min(partitions, len(politician_ids)))]
+    for pid in sorted(politician_ids, key=lambda pid: (-weights[pid], pid)):
+        lightest = min(range(len(groups)), key=lambda i: groups[i][2])
+        part_investments, part_policies, load = groups[lightest]
+        part_investments.extend(investments_by_politician[pid])
+        part_policies.extend(policies_by_politician[pid])
+        groups[lightest] = (part_investments, part_policies, load + weights[pid])
+    return [(part_investments, part_policies) for part_investments, part_policies, _ in groups]
+
+
+def _is_pending(inv: InvestmentRow, pol: PolicyRow, settings: ScoringSettings) -> bool:
+    if settings.open_since is None:
+        return True
+    return (
+        inv.id > settings.last_investment_id
+        or pol.id > settings.last_policy_id
+        or pol.date >= settings.open_since
+    )
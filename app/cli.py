@@ -1,8 +1,11 @@
 import csv
 from pathlib import Path
+import click
 from flask import current_app
 from . import db
+from .migrations import backfill_sector_masks, upgrade_db
 from .models import Politician
+from .response_cache import bump_generation
 from .tasks import run_full_pipeline
 from .scrape.aph_parliamentarians import fetch_parliamentarians, write_parliamentarians_csv
 
@@ -14,6 +17,21 @@ def register_cli(app):
         db.create_all()
         print("Database initialized")
 
+    @app.cli.command("upgrade-db")
+    def upgrade_db_command():
+        """Apply schema changes to an existing database."""
+        applied = upgrade_db()
+        for step in applied:
+            print(f"Applied: {step}")
+        print("Database up to date")
+
+    @app.cli.command("backfill-sectors")
+    def backfill_sectors_command():
+        """Recompute sector tags on existing investments and policies."""
+        updated = backfill_sector_masks()
+        for table, count in updated.items():
+            print(f"Updated {count} {table}")
+
     @app.cli.command("seed-politicians")
     def seed_politicians():
         """Seed politicians from a CSV file."""
@@ -42,6 +60,8 @@ def register_cli(app):
                 db.session.add(politician)
                 count += 1
         db.session.commit()
+        if count:
+            bump_generation()
         print(f"Seeded {count} politicians")
 
     @app.cli.command("fetch-politicians")
@@ -56,7 +76,13 @@ def register_cli(app):
         print(f"Wrote {len(rows)} rows to {csv_path}")
 
     @app.cli.command("run-scrape-once")
-    def run_scrape_once():
+    @click.option(
+        "--workers",
+        type=click.IntRange(min=1),
+        default=None,
+        help="Processes for correlation analysis (default: CORRELATION_WORKERS).",
+    )
+    def run_scrape_once(workers):
         """Run the full scrape and analysis pipeline once."""
-        run_full_pipeline()
+        run_full_pipeline(workers=workers)
         print("Pipeline finished")
@@ -1,6 +1,21 @@
 import os
 
 
+def _parse_host_limits(value: str) -> dict:
+    """Parse "host=rate:burst,host=rate:burst" into {host: (rate, burst)}."""
+    limits = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        host, spec = item.split("=", 1)
+        rate, _, burst = spec.partition(":")
+        try:
+            limits[host.strip().lower()] = (float(rate), int(burst or "1"))
+        except ValueError:
+            continue
+    return limits
+
+
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev")
     @staticmethod
@@ -10,9 +25,20 @@ class Config:
 
     SQLALCHEMY_DATABASE_URI = database_uri()
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # WAL, synchronous=NORMAL, mmap and a larger page cache on every SQLite
+    # connection (see app/storage.py)
+    SQLITE_PRAGMAS_ENABLED = os.environ.get("SQLITE_PRAGMAS_ENABLED", "1") == "1"
+    SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))
 
     SCHEDULER_ENABLED = os.environ.get("SCHEDULER_ENABLED", "1") == "1"
 
+    POLITICIANS_CSV = os.environ.get("POLITICIANS_CSV", "data/politicians.csv")
+    # Where the pickled NameResolver is kept between runs; empty disables
+    NAME_RESOLVER_DIR = os.environ.get("NAME_RESOLVER_DIR", os.path.join(os.getcwd(), "instance"))
+    # Minimum trigram similarity (0-1) for fuzzy name matches
+    FUZZY_NAME_THRESHOLD = float(os.environ.get("FUZZY_NAME_THRESHOLD", "0.6"))
+
     USER_AGENT = os.environ.get(
         "SCRAPER_USER_AGENT",
         "PoliTrackerBot/1.0 (contact: admin@example.com)",
@@ -21,6 +47,53 @@ class Config:
     REQUEST_DELAY_SECS = float(os.environ.get("REQUEST_DELAY_SECS", "2.0"))
     REQUEST_RETRIES = int(os.environ.get("REQUEST_RETRIES", "3"))
 
+    # Per-host token buckets: requests per second and burst size. Hosts not
+    # listed in RATE_LIMIT_HOSTS use the defaults; robots.txt Crawl-delay
+    # can only make a host slower.
+    RATE_LIMIT_PER_SEC = float(os.environ.get("RATE_LIMIT_PER_SEC", "0.5"))
+    RATE_LIMIT_BURST = int(os.environ.get("RATE_LIMIT_BURST", "1"))
+    RATE_LIMIT_HOSTS = _parse_host_limits(
+        os.environ.get(
+            "RATE_LIMIT_HOSTS",
+            "query1.finance.yahoo.com=2:4,www.alphavantage.co=0.08:1",
+        )
+    )
+
+    HTTP_CACHE_ENABLED = os.environ.get("HTTP_CACHE_ENABLED", "1") == "1"
+    HTTP_CACHE_DIR = os.environ.get(
+        "HTTP_CACHE_DIR", os.path.join(os.getcwd(), "instance", "http_cache")
+    )
+    HTTP_CACHE_MAX_BYTES = int(os.environ.get("HTTP_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+    # Streamed downloads (register PDFs) are written to disk in chunks and
+    # abandoned once they pass DOWNLOAD_MAX_BYTES
+    DOWNLOAD_MAX_BYTES = int(os.environ.get("DOWNLOAD_MAX_BYTES", str(200 * 1024 * 1024)))
+    DOWNLOAD_TMP_DIR = os.environ.get("DOWNLOAD_TMP_DIR", "")
+
+    # 0 means one PDF extraction process per CPU
+    PDF_WORKERS = int(os.environ.get("PDF_WORKERS", "0"))
+    # Pages per extraction task; at most PDF_WORKERS tasks run ahead of the parser
+    PDF_PAGES_PER_CHUNK = int(os.environ.get("PDF_PAGES_PER_CHUNK", "16"))
+    # Extracted register text, gzipped and keyed by PDF SHA-256; empty disables
+    TEXT_CACHE_DIR = os.environ.get(
+        "TEXT_CACHE_DIR", os.path.join(os.getcwd(), "instance", "text_cache")
+    )
+
+    # Scraped rows are inserted and committed in batches of this size
+    INGEST_BATCH_SIZE = int(os.environ.get("INGEST_BATCH_SIZE", "500"))
+
+    FETCH_CONCURRENCY = int(os.environ.get("FETCH_CONCURRENCY", "6"))
+    FETCH_MAX_PER_HOST = int(os.environ.get("FETCH_MAX_PER_HOST", "4"))
+
+    HTTP_POOL_CONNECTIONS = int(os.environ.get("HTTP_POOL_CONNECTIONS", "10"))
+    HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", "10"))
+
+    ROBOTS_CACHE_TTL_SECS = int(os.environ.get("ROBOTS_CACHE_TTL_SECS", "86400"))
+    # Failed robots.txt fetches (network or server errors) are retried sooner
+    ROBOTS_FAILURE_TTL_SECS = int(os.environ.get("ROBOTS_FAILURE_TTL_SECS", "300"))
+    # Optional JSON file that keeps robots.txt policies between runs
+    ROBOTS_CACHE_PATH = os.environ.get("ROBOTS_CACHE_PATH", "")
+
     APH_REGISTER_URLS = {
         "house": os.environ.get(
             "APH_REGISTER_HOUSE_PDF",
@@ -39,6 +112,37 @@ class Config:
 
     MARKET_DATA_PROVIDER = os.environ.get("MARKET_DATA_PROVIDER", "yahoo")
     ALPHA_VANTAGE_API_KEY = os.environ.get("ALPHA_VANTAGE_API_KEY", "")
+    # Company names and aliases mapped to ASX codes; only resolved codes are
+    # sent to the market data provider
+    TICKERS_CSV = os.environ.get("TICKERS_CSV", "data/asx_tickers.csv")
+    TICKER_SYMBOL_SUFFIX = os.environ.get("TICKER_SYMBOL_SUFFIX", ".AX")
+    # Days before a symbol the provider did not recognise is tried again
+    UNKNOWN_SYMBOL_TTL_DAYS = int(os.environ.get("UNKNOWN_SYMBOL_TTL_DAYS", "30"))
 
     PRICE_GAIN_THRESHOLD = float(os.environ.get("PRICE_GAIN_THRESHOLD", "0.15"))
     CORRELATION_WINDOW_DAYS = int(os.environ.get("CORRELATION_WINDOW_DAYS", "30"))
+    # Processes used to score correlations, partitioned by politician
+    CORRELATION_WORKERS = int(os.environ.get("CORRELATION_WORKERS", "1"))
+    # Runs a failed price fetch may hold the correlation watermark back
+    # before its investments' pairs are given up on
+    CORRELATION_PRICE_RETRY_RUNS = int(os.environ.get("CORRELATION_PRICE_RETRY_RUNS", "3"))
+
+    # Rendered pages kept per web worker (0 disables the cache). The
+    # generation file is shared by all workers and bumped by the pipeline.
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+    RESPONSE_CACHE_GENERATION_FILE = os.environ.get(
+        "RESPONSE_CACHE_GENERATION_FILE", os.path.join(os.getcwd(), "instance", "cache_generation")
+    )
+
+
+def get_setting(name: str, default=None):
+    """Read a setting from the active Flask app, falling back to Config.
+
+    Lets the shared scrape helpers run both inside the app and from the
+    standalone scripts, which have no application context.
+    """
+    from flask import current_app, has_app_context
+
+    if has_app_context():
+        return current_app.config.get(name, getattr(Config, name, default))
+    return getattr(Config, name, default)
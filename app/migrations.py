@@ -0,0 +1,152 @@
+import logging
+from typing import Dict, List
+from sqlalchemy import inspect, text
+from . import db
+from .models import Investment, Policy
+from .scrape.sectors import investment_sectors, policy_sectors
+
+
+logger = logging.getLogger("politracker")
+
+# (table, column in correlations that points at it)
+SOURCE_HASH_TABLES = (("investments", "investment_id"), ("policies", "policy_id"))
+SECTOR_TABLES = ("investments", "policies")
+# (index, table, columns) for the per-politician lookups made by the
+# correlation run, the profile pages and the static export
+SECONDARY_INDEXES = (
+    ("ix_investments_politician_date", "investments", ("politician_id", "date")),
+    ("ix_policies_politician_date", "policies", ("politician_id", "date")),
+    ("ix_correlations_politician_created", "correlations", ("politician_id", "created_at")),
+    ("ix_correlations_policy_id", "correlations", ("policy_id",)),
+)
+BACKFILL_CHUNK_SIZE = 1000
+
+
+def upgrade_db() -> List[str]:
+    """Bring an existing database up to the current schema.
+
+    create_all() only adds missing tables, so changes to existing tables are
+    applied here. Every step checks the live schema first, so running this
+    repeatedly is a no-op. Returns a description of each step applied.
+    """
+    db.create_all()
+    applied = []
+    for table, fk_column in SOURCE_HASH_TABLES:
+        if _make_source_hash_unique(table, fk_column):
+            applied.append(f"unique source_hash on {table}")
+    if _make_correlation_pairs_unique():
+        applied.append("unique (investment_id, policy_id) on correlations")
+    added = [table for table in SECTOR_TABLES if _add_sector_mask(table)]
+    if added:
+        backfill_sector_masks()
+        applied.extend(f"sector_mask on {table}" for table in added)
+    if _add_watermark_held_runs():
+        applied.append("held_runs on correlation_watermarks")
+    for name, table, columns in SECONDARY_INDEXES:
+        if _add_index(name, table, columns):
+            applied.append(f"index {name}")
+    db.session.commit()
+    return applied
+
+
+def backfill_sector_masks() -> Dict[str, int]:
+    """Recompute sector_mask for every investment and policy.
+
+    Needed after TAXONOMY_VERSION changes. Rows are read and updated in
+    chunks of BACKFILL_CHUNK_SIZE ids, and only rows whose mask changed are
+    written. Returns the number of rows updated per table.
+    """
+    updated = {}
+    updated["investments"] = _backfill(Investment, (Investment.asset_type, Investment.company), investment_sectors)
+    updated["policies"] = _backfill(Policy, (Policy.category,), policy_sectors)
+    return updated
+
+
+def _make_source_hash_unique(table: str, fk_column: str) -> bool:
+    index_name = f"ix_{table}_source_hash"
+    indexes = {ix["name"]: ix for ix in inspect(db.engine).get_indexes(table)}
+    if indexes.get(index_name, {}).get("unique"):
+        return False
+
+    duplicates = (
+        f"SELECT id FROM {table} t WHERE source_hash IS NOT NULL "
+        f"AND id > (SELECT MIN(t2.id) FROM {table} t2 WHERE t2.source_hash = t.source_hash)"
+    )
+    # Keep the oldest row for each hash and move correlations onto it
+    db.session.execute(
+        text(
+            f"UPDATE correlations SET {fk_column} = ("
+            f"SELECT MIN(keep.id) FROM {table} keep JOIN {table} dup ON keep.source_hash = dup.source_hash "
+            f"WHERE dup.id = correlations.{fk_column}) "
+            f"WHERE {fk_column} IN ({duplicates})"
+        )
+    )
+    removed = db.session.execute(text(f"DELETE FROM {table} WHERE id IN ({duplicates})")).rowcount
+    db.session.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+    db.session.execute(text(f"CREATE UNIQUE INDEX {index_name} ON {table} (source_hash)"))
+    logger.info("Removed %s duplicate rows from %s", removed, table)
+    return True
+
+
+def _make_correlation_pairs_unique() -> bool:
+    index_name = "uq_correlations_pair"
+    if index_name in {ix["name"] for ix in inspect(db.engine).get_indexes("correlations")}:
+        return False
+
+    removed = db.session.execute(
+        text(
+            "DELETE FROM correlations WHERE id > (SELECT MIN(c2.id) FROM correlations c2 "
+            "WHERE c2.investment_id = correlations.investment_id AND c2.policy_id = correlations.policy_id)"
+        )
+    ).rowcount
+    db.session.execute(text(f"CREATE UNIQUE INDEX {index_name} ON correlations (investment_id, policy_id)"))
+    logger.info("Removed %s duplicate rows from correlations", removed)
+    return True
+
+
+def _add_sector_mask(table: str) -> bool:
+    if "sector_mask" in {column["name"] for column in inspect(db.engine).get_columns(table)}:
+        return False
+    db.session.execute(text(f"ALTER TABLE {table} ADD COLUMN sector_mask INTEGER NOT NULL DEFAULT 0"))
+    db.session.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_sector_mask ON {table} (sector_mask)"))
+    return True
+
+
+def _add_watermark_held_runs() -> bool:
+    if "held_runs" in {column["name"] for column in inspect(db.engine).get_columns("correlation_watermarks")}:
+        return False
+    db.session.execute(text("ALTER TABLE correlation_watermarks ADD COLUMN held_runs INTEGER NOT NULL DEFAULT 0"))
+    return True
+
+
+def _backfill(model, columns, compute) -> int:
+    updated = 0
+    last_id = 0
+    while True:
+        rows = (
+            model.query.with_entities(model.id, model.sector_mask, *columns)
+            .filter(model.id > last_id)
+            .order_by(model.id)
+            .limit(BACKFILL_CHUNK_SIZE)
+            .all()
+        )
+        if not rows:
+            break
+        changes = []
+        for row_id, current, *values in rows:
+            mask = compute(*values)
+            if mask != current:
+                changes.append({"id": row_id, "sector_mask": mask})
+        if changes:
+            db.session.bulk_update_mappings(model, changes)
+            db.session.commit()
+            updated += len(changes)
+        last_id = rows[-1][0]
+    return updated
+
+
+def _add_index(name: str, table: str, columns) -> bool:
+    if name in {ix["name"] for ix in inspect(db.engine).get_indexes(table)}:
+        return False
+    db.session.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+    return True
@@ -17,6 +17,7 @@ class Politician(db.Model):
 
 class Investment(db.Model):
     __tablename__ = "investments"
+    __table_args__ = (db.Index("ix_investments_politician_date", "politician_id", "date"),)
     id = db.Column(db.Integer, primary_key=True)
     politician_id = db.Column(db.Integer, db.ForeignKey("politicians.id"), nullable=False)
     asset_type = db.Column(db.String(100), nullable=False)
@@ -24,8 +25,10 @@ class Investment(db.Model):
     value = db.Column(db.Float, nullable=True)
     date = db.Column(db.Date, nullable=True)
     source_url = db.Column(db.String(500), nullable=True)
-    source_hash = db.Column(db.String(64), nullable=True, index=True)
+    source_hash = db.Column(db.String(64), nullable=True, index=True, unique=True)
     raw_text = db.Column(db.Text, nullable=True)
+    # Bits from scrape.sectors for asset_type and company, set at ingest
+    sector_mask = db.Column(db.Integer, nullable=False, default=0, server_default="0", index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     correlations = db.relationship("Correlation", backref="investment", lazy=True)
@@ -33,6 +36,7 @@ class Investment(db.Model):
 
 class Policy(db.Model):
     __tablename__ = "policies"
+    __table_args__ = (db.Index("ix_policies_politician_date", "politician_id", "date"),)
     id = db.Column(db.Integer, primary_key=True)
     politician_id = db.Column(db.Integer, db.ForeignKey("politicians.id"), nullable=False)
     bill_name = db.Column(db.String(300), nullable=True)
@@ -40,8 +44,10 @@ class Policy(db.Model):
     date = db.Column(db.Date, nullable=True)
     category = db.Column(db.String(100), nullable=True)
     source_url = db.Column(db.String(500), nullable=True)
-    source_hash = db.Column(db.String(64), nullable=True, index=True)
+    source_hash = db.Column(db.String(64), nullable=True, index=True, unique=True)
     raw_text = db.Column(db.Text, nullable=True)
+    # Bits from scrape.sectors for category, set at ingest
+    sector_mask = db.Column(db.Integer, nullable=False, default=0, server_default="0", index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     correlations = db.relationship("Correlation", backref="policy", lazy=True)
@@ -49,6 +55,11 @@ class Policy(db.Model):
 
 class Correlation(db.Model):
     __tablename__ = "correlations"
+    __table_args__ = (
+        db.Index("uq_correlations_pair", "investment_id", "policy_id", unique=True),
+        db.Index("ix_correlations_politician_created", "politician_id", "created_at"),
+        db.Index("ix_correlations_policy_id", "policy_id"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     politician_id = db.Column(db.Integer, db.ForeignKey("politicians.id"), nullable=False)
     investment_id = db.Column(db.Integer, db.ForeignKey("investments.id"), nullable=False)
@@ -58,3 +69,71 @@ class Correlation(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     politician = db.relationship("Politician", backref="correlations")
+
+
+class CorrelationWatermark(db.Model):
+    """Newest investment and policy ids already run through correlation analysis."""
+
+    __tablename__ = "correlation_watermarks"
+    id = db.Column(db.Integer, primary_key=True)
+    # Provider, threshold and window the marks were computed with
+    settings_key = db.Column(db.String(100), nullable=False)
+    last_investment_id = db.Column(db.Integer, nullable=False, default=0)
+    last_policy_id = db.Column(db.Integer, nullable=False, default=0)
+    last_run_at = db.Column(db.DateTime, nullable=True)
+    # Consecutive runs last_investment_id was held back for failed price fetches
+    held_runs = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+
+class SourceDocument(db.Model):
+    """Ledger of downloaded source documents, one row per URL and content hash."""
+
+    __tablename__ = "source_documents"
+    __table_args__ = (db.UniqueConstraint("source_url", "content_hash", name="uq_source_documents_url_hash"),)
+    id = db.Column(db.Integer, primary_key=True)
+    source_url = db.Column(db.String(500), nullable=False, index=True)
+    content_hash = db.Column(db.String(64), nullable=False, index=True)
+    page_count = db.Column(db.Integer, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, parsed or failed
+    investments_found = db.Column(db.Integer, nullable=True)
+    extracted_at = db.Column(db.DateTime, nullable=True)
+    extract_seconds = db.Column(db.Float, nullable=True)
+    first_seen_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_seen_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class PriceBar(db.Model):
+    """Daily closing price for a symbol, as returned by a market data provider."""
+
+    __tablename__ = "price_history"
+    __table_args__ = (db.UniqueConstraint("provider", "symbol", "date", name="uq_price_history_bar"),)
+    id = db.Column(db.Integer, primary_key=True)
+    provider = db.Column(db.String(20), nullable=False)
+    symbol = db.Column(db.String(200), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    close = db.Column(db.Float, nullable=False)
+
+
+class PriceSeries(db.Model):
+    """Date range of price_history already fetched for a symbol."""
+
+    __tablename__ = "price_series"
+    __table_args__ = (db.UniqueConstraint("provider", "symbol", name="uq_price_series_symbol"),)
+    id = db.Column(db.Integer, primary_key=True)
+    provider = db.Column(db.String(20), nullable=False)
+    symbol = db.Column(db.String(200), nullable=False)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class UnknownSymbol(db.Model):
+    """Symbols a market data provider reported as not found, retried after they expire."""
+
+    __tablename__ = "unknown_symbols"
+    __table_args__ = (db.UniqueConstraint("provider", "symbol", name="uq_unknown_symbols_symbol"),)
+    id = db.Column(db.Integer, primary_key=True)
+    provider = db.Column(db.String(20), nullable=False)
+    symbol = db.Column(db.String(200), nullable=False)
+    reason = db.Column(db.String(200), nullable=True)
+    checked_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,166 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Optional, Tuple
+from flask import Response, make_response, request
+from .config import get_setting
+
+
+logger = logging.getLogger("politracker")
+
+
+class GenerationFile:
+    """A data generation counter kept in a small file.
+
+    Every gunicorn worker (and the pipeline, wherever it runs) reads the
+    same file, so bumping it invalidates all workers' caches at once.
+    Reads cost one stat() unless the file changed since the last read.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._value = 0
+
+    def current(self) -> int:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return 0
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if stamp != self._stamp:
+                self._value = self._read()
+                self._stamp = stamp
+            return self._value
+
+    def bump(self) -> int:
+        with self._lock:
+            value = self._read() + 1
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(str(value))
+            os.replace(tmp_path, self.path)
+            self._stamp = None
+            return value
+
+    def _read(self) -> int:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+
+class ResponseCache:
+    """In-process LRU of rendered pages for one data generation.
+
+    Entries are (body, etag, mimetype) keyed by request path. The whole
+    cache is dropped as soon as a request sees a newer generation.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.generation: Optional[int] = None
+        self._entries: "OrderedDict[str, Tuple[bytes, str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, generation: int, key: str) -> Optional[Tuple[bytes, str, str]]:
+        with self._lock:
+            if generation != self.generation:
+                self._entries.clear()
+                self.generation = generation
+                return None
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, generation: int, key: str, entry: Tuple[bytes, str, str]):
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_generation: Optional[GenerationFile] = None
+_cache: Optional[ResponseCache] = None
+_setup_lock = threading.Lock()
+
+
+def get_generation_file() -> Optional[GenerationFile]:
+    global _generation
+    path = get_setting("RESPONSE_CACHE_GENERATION_FILE")
+    if not path:
+        return None
+    with _setup_lock:
+        if _generation is None or _generation.path != path:
+            _generation = GenerationFile(path)
+        return _generation
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    global _cache
+    max_entries = get_setting("RESPONSE_CACHE_MAX_ENTRIES", 256)
+    if max_entries <= 0:
+        return None
+    with _setup_lock:
+        if _cache is None or _cache.max_entries != max_entries:
+            _cache = ResponseCache(max_entries)
+        return _cache
+
+
+def bump_generation() -> Optional[int]:
+    """Mark the served data as changed; every worker re-renders on its next request."""
+    generation = get_generation_file()
+    if generation is None:
+        return None
+    value = generation.bump()
+    logger.info("Response cache generation %s", value)
+    return value
+
+
+def cached_response(view):
+    """Serve a GET view from the response cache, with a strong ETag.
+
+    Only 200 responses are stored. Clients revalidating with If-None-Match
+    get a 304 without the view running or the database being queried.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        cache = get_response_cache()
+        generation = get_generation_file()
+        if cache is None or generation is None or request.method not in ("GET", "HEAD"):
+            return view(*args, **kwargs)
+
+        current = generation.current()
+        key = request.full_path
+        entry = cache.get(current, key)
+        if entry is None:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.direct_passthrough:
+                return response
+            body = response.get_data()
+            entry = (body, hashlib.sha256(body).hexdigest(), response.mimetype)
+            cache.put(current, key, entry)
+
+        body, etag, mimetype = entry
+        response = Response(body, mimetype=mimetype)
+        response.set_etag(etag)
+        # Browsers may keep the page but must check the ETag before reuse
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
+
+    return wrapper
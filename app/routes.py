@@ -1,34 +1,56 @@
 from flask import Blueprint, render_template, abort
-from .models import Politician
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+from . import db
+from .models import Correlation, Investment, Politician, Policy
+from .response_cache import cached_response
 
 
 main_bp = Blueprint("main", __name__)
 
 
 @main_bp.route("/")
+@cached_response
 def index():
     politicians = Politician.query.order_by(Politician.name.asc()).all()
-    total_count = Politician.query.count()
-    house_count = Politician.query.filter_by(chamber="House").count()
-    senate_count = Politician.query.filter_by(chamber="Senate").count()
+    # One grouped count instead of a COUNT per chamber
+    chamber_counts = dict(
+        db.session.query(Politician.chamber, func.count(Politician.id)).group_by(Politician.chamber).all()
+    )
     return render_template(
         "index.html",
         politicians=politicians,
-        total_count=total_count,
-        house_count=house_count,
-        senate_count=senate_count,
+        total_count=sum(chamber_counts.values()),
+        house_count=chamber_counts.get("House", 0),
+        senate_count=chamber_counts.get("Senate", 0),
     )
 
 
 @main_bp.route("/politician/<int:pol_id>")
+@cached_response
 def politician_detail(pol_id):
-    politician = Politician.query.get(pol_id)
+    politician = db.session.get(Politician, pol_id)
     if not politician:
         abort(404)
 
-    investments = sorted(politician.investments, key=lambda i: i.date or i.created_at, reverse=True)
-    policies = sorted(politician.policies, key=lambda p: p.date or p.created_at, reverse=True)
-    correlations = sorted(politician.correlations, key=lambda c: c.created_at, reverse=True)
+    # Newest first, undated rows last; each list is one indexed query and
+    # the correlations bring their investments and policies in two more
+    investments = (
+        Investment.query.filter_by(politician_id=pol_id)
+        .order_by(Investment.date.desc().nullslast(), Investment.created_at.desc())
+        .all()
+    )
+    policies = (
+        Policy.query.filter_by(politician_id=pol_id)
+        .order_by(Policy.date.desc().nullslast(), Policy.created_at.desc())
+        .all()
+    )
+    correlations = (
+        Correlation.query.options(selectinload(Correlation.investment), selectinload(Correlation.policy))
+        .filter_by(politician_id=pol_id)
+        .order_by(Correlation.created_at.desc())
+        .all()
+    )
 
     return render_template(
         "politician.html",
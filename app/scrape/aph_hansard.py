@@ -5,15 +5,19 @@ from datetime import date
 from urllib.parse import urljoin
 from bs4 import BeautifulSoup
 from flask import current_app
-from .. import db
-from ..models import Politician, Policy
-from .utils import fetch_url, hash_text, parse_date, normalize_name, build_last_name_index, build_full_name_index, detect_name_in_line, match_speaker_line
+from ..models import Policy
+from .fetcher import fetch_many
+from .ingest import BulkWriter, PolicyRecord, load_known_hashes
+from .roster import Roster, load_roster
+from .sectors import infer_policy_category, policy_sectors
+from .utils import fetch_url, hash_text, parse_date
 
 
 logger = logging.getLogger("politracker")
 
 
-def scrape_hansard_updates() -> List[Policy]:
+def scrape_hansard_updates(roster: Optional[Roster] = None) -> int:
+    """Scrape recent Hansard pages and return the number of new policies."""
     user_agent = current_app.config["USER_AGENT"]
     timeout = current_app.config["REQUEST_TIMEOUT_SECS"]
     retries = current_app.config["REQUEST_RETRIES"]
@@ -22,16 +26,16 @@ def scrape_hansard_updates() -> List[Policy]:
     base = current_app.config["APH_HANSARD_BASE"]
     html = fetch_url(base, user_agent, timeout, retries, delay)
     if not html:
-        return []
+        return 0
 
     soup = BeautifulSoup(html, "html.parser")
     items = soup.select("a")
-    created = []
 
-    politicians = Politician.query.all()
-    last_name_index = build_last_name_index([p.name for p in politicians])
-    full_name_index = build_full_name_index([p.name for p in politicians])
+    if roster is None:
+        roster = load_roster()
+    known_hashes = load_known_hashes(Policy)
 
+    titles_by_url = {}
     for link in items[:60]:
         href = link.get("href")
         text = (link.get_text() or "").strip()
@@ -39,62 +43,71 @@ def scrape_hansard_updates() -> List[Policy]:
             continue
 
         full_url = urljoin(base, href)
-        page_html = fetch_url(full_url, user_agent, timeout, retries, delay)
-        if not page_html:
-            continue
+        titles_by_url.setdefault(full_url, []).append(text)
+
+    with BulkWriter(Policy) as writer:
+        for full_url, result in fetch_many(titles_by_url, user_agent, timeout, retries, delay):
+            if not result or not result.content:
+                continue
 
-        for policy in _parse_policy_page(text, full_url, page_html, last_name_index, full_name_index):
-            if policy:
-                created.append(policy)
+            for text in titles_by_url[full_url]:
+                for record in _parse_policy_page(text, full_url, result.content, roster, known_hashes):
+                    writer.add(record)
 
-    db.session.commit()
-    return created
+    return writer.written
 
 
-def _parse_policy_page(title: str, url: str, html: bytes, last_name_index, full_name_index) -> List[Policy]:
+def _parse_policy_page(
+    title: str, url: str, html: bytes, roster: Roster, known_hashes
+) -> List[PolicyRecord]:
     soup = BeautifulSoup(html, "html.parser")
     text = soup.get_text("\n")
     lines = [line.strip() for line in text.splitlines() if line.strip()]
 
     date = _extract_date(lines)
-    detected = _detect_speakers(lines, last_name_index, full_name_index)
+    detected = _detect_speakers(lines, roster)
     policies = []
+    category = _infer_category(title)
 
-    for pol in detected:
-        source_hash = hash_text(f"{pol.id}|{title}|{url}")
-        existing = Policy.query.filter_by(source_hash=source_hash).first()
-        if existing:
+    for politician_id in detected:
+        source_hash = hash_text(f"{politician_id}|{title}|{url}")
+        if source_hash in known_hashes:
             continue
-
-        policy = Policy(
-            politician_id=pol.id,
-            bill_name=title[:300],
-            vote=None,
-            date=date,
-            category=_infer_category(title),
-            source_url=url,
-            source_hash=source_hash,
-            raw_text=title,
+        known_hashes.add(source_hash)
+
+        policies.append(
+            PolicyRecord(
+                politician_id=politician_id,
+                bill_name=title[:300],
+                vote=None,
+                date=date,
+                category=category,
+                source_url=url,
+                source_hash=source_hash,
+                raw_text=title,
+                sector_mask=policy_sectors(category),
+            )
         )
-        db.session.add(policy)
-        policies.append(policy)
 
     return policies
 
 
-def _detect_speakers(lines, last_name_index, full_name_index) -> List[Politician]:
+def _detect_speakers(lines, roster: Roster) -> List[int]:
+    fuzzy_threshold = current_app.config["FUZZY_NAME_THRESHOLD"]
     matches = []
     seen = set()
     for line in lines:
-        name = match_speaker_line(line, last_name_index)
+        name = roster.resolver.resolve_speaker(line)
+        if not name:
+            name = roster.resolver.detect_in_line(line)
         if not name:
-            name = detect_name_in_line(line, full_name_index)
+            name = roster.resolver.resolve_speaker_fuzzy(line, fuzzy_threshold)
         if not name:
             continue
-        politician = Politician.query.filter_by(name=name).first()
-        if politician and politician.id not in seen:
-            matches.append(politician)
-            seen.add(politician.id)
+        politician_id = roster.id_for_name(name)
+        if politician_id is not None and politician_id not in seen:
+            matches.append(politician_id)
+            seen.add(politician_id)
         if len(matches) >= 5:
             break
     return matches
@@ -109,13 +122,4 @@ def _extract_date(lines) -> Optional[date]:
 
 
 def _infer_category(text: str) -> str:
-    lower = text.lower()
-    if "mining" in lower or "coal" in lower:
-        return "mining"
-    if "energy" in lower or "renewable" in lower:
-        return "energy"
-    if "bank" in lower or "finance" in lower:
-        return "banking"
-    if "housing" in lower or "property" in lower:
-        return "property"
-    return "other"
+    return infer_policy_category(text)
@@ -1,58 +1,172 @@
-import io
 import logging
 import re
-from typing import List, Optional
+import time
+from collections import deque
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
 from urllib.parse import urljoin
 from flask import current_app
-from PyPDF2 import PdfReader
 from .. import db
-from ..models import Politician, Investment
-from .utils import fetch_url, hash_text, build_name_index, normalize_name, build_full_name_index, detect_name_in_line
+from ..models import Investment, SourceDocument
+from .fetcher import fetch_many
+from .pdf_text import PdfTextExtractor
+from .text_cache import CachedDocument, get_text_cache
+from .ingest import BulkWriter, InvestmentRecord, load_known_hashes
+from .roster import Roster, load_roster
+from .sectors import infer_asset_type, investment_sectors
+from .utils import fetch_url, hash_text
 from bs4 import BeautifulSoup
 
 
 logger = logging.getLogger("politracker")
 
+SECTION_RE = re.compile(r"^\d+\.\s+(.*)$")
+FAMILY_NAME_RE = re.compile(r"^FAMILY NAME\s+(.+)$", re.IGNORECASE)
+GIVEN_NAMES_RE = re.compile(r"^GIVEN NAMES\s+(.+)$", re.IGNORECASE)
 
-def scrape_register_disclosures() -> List[Investment]:
+
+def scrape_register_disclosures(roster: Optional[Roster] = None) -> int:
+    """Scrape the registers of interests and return the number of new investments."""
     user_agent = current_app.config["USER_AGENT"]
     timeout = current_app.config["REQUEST_TIMEOUT_SECS"]
     retries = current_app.config["REQUEST_RETRIES"]
     delay = current_app.config["REQUEST_DELAY_SECS"]
 
-    created = []
-    names = [p.name for p in Politician.query.all()]
-    name_index = build_name_index(names)
-    full_name_index = build_full_name_index(names)
-    for chamber, url in current_app.config["APH_REGISTER_URLS"].items():
-        pdf_urls = _resolve_register_pdfs(url, user_agent, timeout, retries, delay)
-        for pdf_url in pdf_urls:
-            pdf_bytes = fetch_url(pdf_url, user_agent, timeout, retries, delay)
-            if not pdf_bytes:
+    if roster is None:
+        roster = load_roster()
+    known_hashes = load_known_hashes(Investment)
+    pdf_urls = []
+    for url in current_app.config["APH_REGISTER_URLS"].values():
+        pdf_urls.extend(_resolve_register_pdfs(url, user_agent, timeout, retries, delay))
+
+    text_cache = get_text_cache()
+    changed = 0
+    unchanged = 0
+    with PdfTextExtractor() as extractor, BulkWriter(Investment) as writer:
+        # Keep a few documents submitted ahead of the parser so the workers
+        # move straight on to the next volume; the extractor itself only
+        # runs one page range per worker ahead of what has been parsed
+        backlog = deque()
+        for pdf_url, result in fetch_many(pdf_urls, user_agent, timeout, retries, delay, stream=True):
+            if not result:
+                continue
+
+            entry = _ledger_entry(pdf_url, result.sha256)
+            if entry.status == "parsed":
+                # Byte-identical to a document we already parsed
+                unchanged += 1
+                result.close()
                 continue
 
             try:
-                text = _pdf_to_text(pdf_bytes)
+                if text_cache and text_cache.has(result.sha256):
+                    page_count = entry.page_count or _known_page_count(result.sha256)
+                    document = CachedDocument(pdf_url, result.sha256, page_count, text_cache)
+                else:
+                    document = extractor.submit(result.path, pdf_url)
             except Exception as exc:
                 logger.warning("PDF parse failed %s: %s", pdf_url, exc)
+                entry.status = "failed"
+                result.close()
                 continue
 
-            for inv in _extract_investments(text, pdf_url, name_index, full_name_index):
-                created.append(inv)
-
-    db.session.commit()
-    return created
+            changed += 1
+            backlog.append((result, document, entry))
+            if len(backlog) > extractor.workers:
+                _consume_document(*backlog.popleft(), text_cache, roster, known_hashes, writer)
+
+        while backlog:
+            _consume_document(*backlog.popleft(), text_cache, roster, known_hashes, writer)
+
+    logger.info("Register documents: %s changed, %s unchanged", changed, unchanged)
+    return writer.written
+
+
+def _ledger_entry(source_url: str, content_hash: str) -> SourceDocument:
+    entry = SourceDocument.query.filter_by(source_url=source_url, content_hash=content_hash).first()
+    now = datetime.utcnow()
+    if entry is None:
+        entry = SourceDocument(source_url=source_url, content_hash=content_hash, status="pending", first_seen_at=now)
+        db.session.add(entry)
+    entry.last_seen_at = now
+    return entry
+
+
+def _known_page_count(content_hash: str) -> Optional[int]:
+    """Page count recorded for the same bytes under any URL or earlier attempt."""
+    row = (
+        SourceDocument.query.with_entities(SourceDocument.page_count)
+        .filter(SourceDocument.content_hash == content_hash, SourceDocument.page_count.isnot(None))
+        .first()
+    )
+    return row[0] if row else None
+
+
+def _consume_document(
+    result, document, entry: SourceDocument, text_cache, roster: Roster, known_hashes, writer: BulkWriter
+) -> int:
+    timer = _PageTimer()
+    pages = timer.wrap(document.iter_pages())
+    if text_cache and not isinstance(document, CachedDocument):
+        pages = text_cache.tee(entry.content_hash, pages)
+
+    found = 0
+    with result:
+        try:
+            for record in _extract_investments(_iter_lines(pages), document.source_url, roster, known_hashes):
+                writer.add(record)
+                found += 1
+        except Exception as exc:
+            logger.warning("PDF parse failed %s: %s", document.source_url, exc)
+            document.cancel()
+            entry.status = "failed"
+            writer.flush()
+            return 0
+
+    entry.status = "parsed"
+    if document.page_count is not None:
+        entry.page_count = document.page_count
+    entry.investments_found = found
+    if not isinstance(document, CachedDocument):
+        entry.extracted_at = datetime.utcnow()
+        entry.extract_seconds = timer.elapsed
+    # The ledger only says "parsed" once the document's rows are stored
+    writer.flush()
+    return found
+
+
+class _PageTimer:
+    """Accumulates the time spent waiting for page text, excluding parsing."""
+
+    def __init__(self):
+        self.elapsed = 0.0
+
+    def wrap(self, pages: Iterable[str]) -> Iterator[str]:
+        iterator = iter(pages)
+        while True:
+            started = time.perf_counter()
+            try:
+                text = next(iterator)
+            except StopIteration:
+                self.elapsed += time.perf_counter() - started
+                return
+            self.elapsed += time.perf_counter() - started
+            yield text
 
 
-def _pdf_to_text(pdf_bytes: bytes) -> str:
-    reader = PdfReader(io.BytesIO(pdf_bytes))
-    pages = [page.extract_text() or "" for page in reader.pages]
-    return "\n".join(pages)
+def _iter_lines(page_texts: Iterable[str]) -> Iterator[str]:
+    for text in page_texts:
+        for line in text.splitlines():
+            line = line.strip()
+            if line:
+                yield line
 
 
-def _extract_investments(text: str, source_url: str, name_index, full_name_index) -> List[Investment]:
-    results = []
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
+def _extract_investments(
+    lines: Iterable[str], source_url: str, roster: Roster, known_hashes
+) -> Iterator[InvestmentRecord]:
+    resolver = roster.resolver
+    fuzzy_threshold = current_app.config["FUZZY_NAME_THRESHOLD"]
 
     current_name = None
     family_name = None
@@ -69,23 +183,25 @@ def _extract_investments(text: str, source_url: str, name_index, full_name_index
 
         if family_name and given_names and not current_name:
             combined = f"{given_names} {family_name}"
-            normalized = normalize_name(combined)
-            current_name = name_index.get(normalized, combined)
+            current_name = (
+                resolver.resolve_full(combined) or resolver.resolve_fuzzy(combined, fuzzy_threshold) or combined
+            )
 
         if line.lower().startswith("member:") or line.lower().startswith("senator:"):
             raw_name = line.split(":", 1)[-1].strip()
-            normalized = normalize_name(raw_name)
-            current_name = name_index.get(normalized, raw_name)
+            current_name = (
+                resolver.resolve_full(raw_name) or resolver.resolve_fuzzy(raw_name, fuzzy_threshold) or raw_name
+            )
             continue
 
         if not current_name:
-            detected = detect_name_in_line(line, full_name_index)
+            detected = resolver.detect_in_line(line)
             if detected:
                 current_name = detected
                 continue
 
         if not current_name:
-            parsed_name = _parse_comma_name(line, name_index)
+            parsed_name = resolver.resolve_surname_given(line)
             if parsed_name:
                 current_name = parsed_name
                 continue
@@ -93,34 +209,34 @@ def _extract_investments(text: str, source_url: str, name_index, full_name_index
         if not current_name:
             continue
 
-        section_match = re.match(r"^\\d+\\.\\s+(.*)$", line)
+        section_match = SECTION_RE.match(line)
         if section_match:
             current_section = section_match.group(1).strip().lower()
             continue
 
         if current_section and _is_data_line(line):
-            politician = Politician.query.filter_by(name=current_name).first()
-            if not politician:
+            politician_id = roster.id_for_name(current_name)
+            if politician_id is None:
                 continue
 
             source_hash = hash_text(f"{current_name}|{line}")
-            existing = Investment.query.filter_by(source_hash=source_hash).first()
-            if existing:
+            if source_hash in known_hashes:
                 continue
-
-            investment = Investment(
-                politician_id=politician.id,
-                asset_type=_infer_asset_type_from_section(current_section, line),
-                company=line[:200],
+            known_hashes.add(source_hash)
+
+            asset_type = _infer_asset_type_from_section(current_section, line)
+            company = line[:200]
+            yield InvestmentRecord(
+                politician_id=politician_id,
+                asset_type=asset_type,
+                company=company,
                 value=None,
                 date=None,
                 source_url=source_url,
                 source_hash=source_hash,
                 raw_text=line,
+                sector_mask=investment_sectors(asset_type, company),
             )
-            db.session.add(investment)
-            results.append(investment)
-    return results
 
 
 def _looks_like_investment(line: str) -> bool:
@@ -129,30 +245,8 @@ def _looks_like_investment(line: str) -> bool:
     return any(keyword in text for keyword in keywords)
 
 
-def _infer_asset_type(line: str) -> str:
-    text = line.lower()
-    if "property" in text or "real estate" in text:
-        return "property"
-    if "share" in text or "stock" in text or "equity" in text:
-        return "equity"
-    if "trust" in text:
-        return "trust"
-    return "declared asset"
-
-
 def _infer_asset_type_from_section(section: str, line: str) -> str:
-    text = f"{section} {line}".lower()
-    if "real estate" in text or "property" in text:
-        return "property"
-    if "share" in text or "company" in text or "equity" in text:
-        return "equity"
-    if "trust" in text:
-        return "trust"
-    if "bond" in text or "debenture" in text:
-        return "fixed income"
-    if "liability" in text or "debt" in text:
-        return "liability"
-    return _infer_asset_type(line)
+    return infer_asset_type(section, line)
 
 
 def _is_data_line(line: str) -> bool:
@@ -185,14 +279,14 @@ def _is_data_line(line: str) -> bool:
 
 
 def _extract_family_name(line: str) -> Optional[str]:
-    match = re.match(r"^FAMILY NAME\\s+(.+)$", line, re.IGNORECASE)
+    match = FAMILY_NAME_RE.match(line)
     if match:
         return match.group(1).strip().title()
     return None
 
 
 def _extract_given_names(line: str) -> Optional[str]:
-    match = re.match(r"^GIVEN NAMES\\s+(.+)$", line, re.IGNORECASE)
+    match = GIVEN_NAMES_RE.match(line)
     if match:
         return match.group(1).strip().title()
     return None
@@ -232,20 +326,3 @@ def _is_register_pdf(url: str) -> bool:
         return True
     return False
 
-
-def _parse_comma_name(line: str, name_index):
-    if "," not in line:
-        return None
-    parts = [p.strip() for p in line.split(",", 1)]
-    if len(parts) < 2:
-        return None
-    last = parts[0]
-    if not parts[1]:
-        return None
-    first_parts = parts[1].split()
-    if not first_parts:
-        return None
-    first = first_parts[0]
-    candidate = f"{first} {last}"
-    normalized = normalize_name(candidate)
-    return name_index.get(normalized)
@@ -0,0 +1,74 @@
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+from flask import current_app, has_app_context
+from ..config import get_setting
+from .utils import FetchResult, fetch_document
+
+
+_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+
+
+def fetch_many(
+    urls: Iterable[str],
+    user_agent: str,
+    timeout: int,
+    retries: int,
+    delay: float,
+    max_workers: Optional[int] = None,
+    stream: bool = False,
+) -> Iterator[Tuple[str, Optional[FetchResult]]]:
+    """Fetch URLs on a thread pool and yield (url, result) as each completes.
+
+    Each fetch goes through fetch_document, so robots.txt, the HTTP cache
+    and the per-host token buckets all apply; FETCH_MAX_PER_HOST also caps
+    how many requests are in flight to one host. Only a bounded number of
+    URLs is submitted ahead of the consumer, so bodies don't pile up in
+    memory. Duplicate URLs are fetched once. A None result means the URL
+    was blocked by robots.txt or every attempt failed. With stream=True
+    bodies are spooled to disk and the caller should close() each result.
+    """
+    workers = max(1, max_workers or get_setting("FETCH_CONCURRENCY", 6))
+    app = current_app._get_current_object() if has_app_context() else None
+    queue = iter(dict.fromkeys(urls))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch") as pool:
+        pending = set()
+
+        def submit_next() -> bool:
+            url = next(queue, None)
+            if url is None:
+                return False
+            pending.add(pool.submit(_fetch_one, app, url, user_agent, timeout, retries, delay, stream))
+            return True
+
+        for _ in range(workers):
+            if not submit_next():
+                break
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                submit_next()
+                yield future.result()
+
+
+def _fetch_one(app, url: str, user_agent: str, timeout: int, retries: int, delay: float, stream: bool):
+    with _host_slot(url):
+        if app is None:
+            return url, fetch_document(url, user_agent, timeout, retries, delay, stream=stream)
+        with app.app_context():
+            return url, fetch_document(url, user_agent, timeout, retries, delay, stream=stream)
+
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    host = urlsplit(url).netloc.lower()
+    with _host_slots_lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = threading.BoundedSemaphore(max(1, get_setting("FETCH_MAX_PER_HOST", 4)))
+            _host_slots[host] = slot
+        return slot
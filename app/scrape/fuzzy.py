@@ -0,0 +1,63 @@
+import re
+from typing import Dict, List, Set, Tuple
+
+
+NON_LETTER_RE = re.compile(r"[^a-z]+")
+
+
+class TrigramIndex:
+    """Inverted trigram index for fuzzy lookups of short strings.
+
+    Keys and queries are compacted to bare letters first, so PDF artefacts
+    like "alba nese" or a dropped hyphen compare equal to the roster form.
+    Only keys sharing at least one trigram with the query are scored, so a
+    lookup never scans the whole roster.
+    """
+
+    def __init__(self):
+        self._keys: List[str] = []
+        self._values: List[str] = []
+        self._grams: List[Set[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+
+    def add(self, key: str, value: str):
+        grams = trigrams(key)
+        if not grams:
+            return
+        key_id = len(self._keys)
+        self._keys.append(key)
+        self._values.append(value)
+        self._grams.append(grams)
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(key_id)
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """Return up to limit (value, similarity) pairs, best first.
+
+        Similarity is the Jaccard index of the trigram sets; each value is
+        reported once, with the score of its best-matching key.
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for key_id in self._postings.get(gram, ()):
+                shared[key_id] = shared.get(key_id, 0) + 1
+
+        best: Dict[str, float] = {}
+        for key_id, overlap in shared.items():
+            score = overlap / (len(grams) + len(self._grams[key_id]) - overlap)
+            value = self._values[key_id]
+            if score > best.get(value, 0.0):
+                best[value] = score
+        ranked = sorted(best.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+
+def trigrams(text: str) -> Set[str]:
+    compact = NON_LETTER_RE.sub("", text.lower())
+    if not compact:
+        return set()
+    padded = f"  {compact} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
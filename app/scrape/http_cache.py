@@ -0,0 +1,190 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+from ..config import get_setting
+
+
+logger = logging.getLogger("politracker")
+
+
+class HttpCache:
+    """On-disk store of response bodies and their validators.
+
+    Each URL maps to "<sha256>.body" plus a "<sha256>.json" metadata file.
+    The metadata file's mtime is bumped on every hit, and the least recently
+    used entries are evicted once the bodies exceed max_bytes.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        os.makedirs(root, exist_ok=True)
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        meta_path, body_path = self._paths(url)
+        if not os.path.exists(meta_path) or not os.path.exists(body_path):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def conditional_headers(self, meta: Optional[Dict]) -> Dict[str, str]:
+        headers = {}
+        if not meta:
+            return headers
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def read_body(self, url: str) -> Optional[bytes]:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except OSError:
+            return None
+        self._touch(meta_path)
+        return body
+
+    def pin_body(self, url: str) -> Optional[str]:
+        """Like pin_file() for url's cached body; None if the entry is gone."""
+        meta_path, body_path = self._paths(url)
+        try:
+            pinned = self.pin_file(body_path)
+        except FileNotFoundError:
+            return None
+        self._touch(meta_path)
+        return pinned
+
+    def pin_file(self, path: str) -> str:
+        """Hard-link path to a new private file that the caller must delete.
+
+        Eviction only removes the cache's own name for a body, so a pinned
+        copy stays readable for as long as the caller holds it. Falls back
+        to copying on filesystems without hard links.
+        """
+        pinned = os.path.join(self.root, f"{uuid.uuid4().hex}.pin")
+        try:
+            os.link(path, pinned)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            shutil.copyfile(path, pinned)
+        return pinned
+
+    def store(self, url: str, headers, body: bytes) -> Dict:
+        handle, tmp_path = self.new_body_file()
+        with handle:
+            handle.write(body)
+        return self.commit(url, headers, tmp_path, hashlib.sha256(body).hexdigest(), len(body))
+
+    def new_body_file(self):
+        """Open a temporary file in the cache directory for a streamed body.
+
+        Pass the path to commit() once the download has finished.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        return os.fdopen(fd, "wb"), tmp_path
+
+    def commit(self, url: str, headers, tmp_path: str, sha256: str, size: int) -> Dict:
+        meta_path, body_path = self._paths(url)
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "sha256": sha256,
+            "size": size,
+            "stored_at": time.time(),
+        }
+        previous = self.lookup(url)
+        os.replace(tmp_path, body_path)
+        _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += meta["size"] - (previous or {}).get("size", 0)
+        self._evict()
+        return meta
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.root, key)
+        return f"{base}.json", f"{base}.body"
+
+    def _touch(self, meta_path: str):
+        try:
+            os.utime(meta_path, None)
+        except OSError:
+            pass
+
+    def _evict(self):
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size in self._scan())
+            if self._total_bytes <= self.max_bytes:
+                return
+
+            for meta_path, size in self._scan():
+                if self._total_bytes <= self.max_bytes:
+                    break
+                body_path = meta_path[: -len(".json")] + ".body"
+                for path in (meta_path, body_path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                self._total_bytes -= size
+
+    def _scan(self):
+        """Return (meta_path, size) pairs, least recently used first."""
+        entries = []
+        for name in os.listdir(self.root):
+            if not name.endswith(".json"):
+                continue
+            meta_path = os.path.join(self.root, name)
+            try:
+                mtime = os.path.getmtime(meta_path)
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    size = json.load(f).get("size", 0)
+            except Exception:
+                continue
+            entries.append((mtime, meta_path, size))
+        entries.sort()
+        return [(path, size) for _, path, size in entries]
+
+
+_cache: Optional[HttpCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    global _cache
+    if not get_setting("HTTP_CACHE_ENABLED", True):
+        return None
+    root = get_setting("HTTP_CACHE_DIR")
+    if not root:
+        return None
+    with _cache_lock:
+        if _cache is None or _cache.root != root:
+            _cache = HttpCache(root, get_setting("HTTP_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+        return _cache
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
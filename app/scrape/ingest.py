@@ -0,0 +1,90 @@
+from collections import namedtuple
+from typing import Dict, List, Optional, Set
+from sqlalchemy.dialects import postgresql, sqlite
+from .. import db
+from ..config import get_setting
+
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING
+_UPSERT_DIALECTS = {"sqlite": sqlite, "postgresql": postgresql}
+
+# Plain rows for the bulk writer; field names match the model columns
+InvestmentRecord = namedtuple(
+    "InvestmentRecord",
+    "politician_id asset_type company value date source_url source_hash raw_text sector_mask",
+)
+PolicyRecord = namedtuple(
+    "PolicyRecord",
+    "politician_id bill_name vote date category source_url source_hash raw_text sector_mask",
+)
+
+
+def insert_ignoring_conflicts(model, index_elements: List[str]):
+    """INSERT for model that skips rows clashing on the unique index_elements.
+
+    Uses ON CONFLICT DO NOTHING on SQLite and PostgreSQL, a plain INSERT
+    elsewhere. Execute it with a list of mappings; rowcount is the number
+    of rows actually inserted.
+    """
+    dialect = _UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+    if dialect is None:
+        return model.__table__.insert()
+    return dialect.insert(model.__table__).on_conflict_do_nothing(index_elements=index_elements)
+
+
+def load_known_hashes(model) -> Set[str]:
+    """Load every source_hash already stored for model into a set.
+
+    Scrapers check candidate rows against this set instead of running a
+    SELECT per parsed line, and add the hashes they create as they go.
+    """
+    rows = db.session.query(model.source_hash).filter(model.source_hash.isnot(None))
+    return {source_hash for (source_hash,) in rows}
+
+
+class BulkWriter:
+    """Buffers plain records for model and inserts them in fixed-size batches.
+
+    Each batch is written with one executemany and committed, so memory
+    stays flat however many rows a run produces and a crash keeps every
+    batch already written. Rows whose source_hash is already stored (for
+    example by a concurrent run) are skipped rather than failing the
+    batch, and `written` counts only the rows actually inserted. Call
+    flush() before recording anything that claims the buffered rows are
+    stored, and use the writer as a context manager to flush the last
+    partial batch.
+    """
+
+    def __init__(self, model, batch_size: Optional[int] = None):
+        self.model = model
+        self.batch_size = max(1, batch_size or get_setting("INGEST_BATCH_SIZE", 500))
+        self.written = 0
+        self._buffer: List[Dict] = []
+        self._statement = None
+
+    def __enter__(self) -> "BulkWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+    def __len__(self) -> int:
+        return self.written + len(self._buffer)
+
+    def add(self, record) -> None:
+        self._buffer.append(record._asdict())
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            result = db.session.execute(self._insert(), self._buffer)
+            self.written += result.rowcount
+            self._buffer = []
+        db.session.commit()
+
+    def _insert(self):
+        if self._statement is None:
+            self._statement = insert_ignoring_conflicts(self.model, ["source_hash"])
+        return self._statement
@@ -1,27 +1,253 @@
 import logging
-from datetime import datetime
-from typing import Optional
-import requests
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import numpy as np
 from flask import current_app
+from .. import db
+from ..models import PriceBar, PriceSeries, UnknownSymbol
+from .ratelimit import wait_for_slot
+from .session import get_session
 
 
 logger = logging.getLogger("politracker")
 
+ONE_DAY = timedelta(days=1)
+# Packed series keys are symbol_index * KEY_STRIDE + date ordinal, so one
+# sorted array holds every symbol's dates in consecutive segments
+KEY_STRIDE = 4_000_000
+
+Bars = List[Tuple[date, float]]
+
+
+class SymbolNotFound(Exception):
+    """The provider answered, but has no data for the symbol."""
+
+
+class PriceStore:
+    """Daily closes per symbol, kept in price_history and served from memory.
+
+    A symbol's history is fetched from the provider at most once per run, and
+    only for the dates price_series does not already cover. series_for hands
+    the loaded closes to pack_series/score_windows, the one place window
+    returns are computed.
+
+    Symbols the provider reports as unknown are kept in unknown_symbols and
+    not requested again until UNKNOWN_SYMBOL_TTL_DAYS have passed. Symbols
+    whose fetch failed for any other reason are listed in `failed` and
+    retried by the next store.
+    """
+
+    def __init__(self, provider: Optional[str] = None):
+        self.provider = provider or current_app.config.get("MARKET_DATA_PROVIDER", "yahoo")
+        self.requests = 0
+        self._dates: Dict[str, List[date]] = {}
+        self._closes: Dict[str, List[float]] = {}
+        self._coverage: Dict[str, Tuple[date, date]] = {}
+        self._failed = set()
+        self._unknown = self._load_unknown()
+
+    @property
+    def failed(self) -> Set[str]:
+        """Symbols whose prices could not be fetched this run (not unknown ones)."""
+        return set(self._failed)
+
+    @property
+    def configured(self) -> bool:
+        """False when the provider cannot be queried at all (Alpha Vantage without an API key)."""
+        return self.provider != "alpha_vantage" or bool(current_app.config.get("ALPHA_VANTAGE_API_KEY"))
+
+    def prefetch(self, windows: Iterable[Tuple[str, date, date]]) -> None:
+        """Load every symbol once, spanning all of its requested windows."""
+        spans: Dict[str, Tuple[date, date]] = {}
+        for symbol, start, end in windows:
+            if not symbol:
+                continue
+            if symbol in spans:
+                lo, hi = spans[symbol]
+                spans[symbol] = (min(lo, start), max(hi, end))
+            else:
+                spans[symbol] = (start, end)
+        for symbol, (start, end) in spans.items():
+            self.ensure(symbol, start, end)
+
+    def ensure(self, symbol: str, start: date, end: date) -> bool:
+        """Make sure closes from start to end are loaded; False if the provider failed."""
+        if symbol in self._failed or symbol in self._unknown:
+            return False
+        if symbol not in self._coverage:
+            self._load(symbol)
+
+        dirty = False
+        for gap_start, gap_end in _gaps(self._coverage.get(symbol), start, end):
+            try:
+                bars = self._fetch(symbol, gap_start, gap_end)
+            except SymbolNotFound as exc:
+                self._mark_unknown(symbol, str(exc))
+                dirty = True
+                break
+            if bars is None:
+                self._failed.add(symbol)
+                break
+            self._store(symbol, gap_start, gap_end, bars)
+            dirty = True
+        if dirty:
+            db.session.commit()
+        return symbol not in self._failed and symbol not in self._unknown
+
+    def series_for(self, symbols: Iterable[str]) -> Dict[str, Tuple[List[date], List[float]]]:
+        """Loaded (dates, closes) for each symbol whose prices are available."""
+        return {
+            symbol: (self._dates.get(symbol, []), self._closes.get(symbol, []))
+            for symbol in symbols
+            if symbol and symbol not in self._failed and symbol not in self._unknown
+        }
+
+    def _load_unknown(self) -> set:
+        ttl = timedelta(days=current_app.config.get("UNKNOWN_SYMBOL_TTL_DAYS", 30))
+        expired = UnknownSymbol.query.filter(UnknownSymbol.checked_at < datetime.utcnow() - ttl).delete()
+        if expired:
+            db.session.commit()
+        rows = UnknownSymbol.query.with_entities(UnknownSymbol.symbol).filter_by(provider=self.provider).all()
+        return {row[0] for row in rows}
+
+    def _mark_unknown(self, symbol: str, reason: str) -> None:
+        logger.info("No %s price data for %s: %s", self.provider, symbol, reason)
+        self._unknown.add(symbol)
+        db.session.add(UnknownSymbol(provider=self.provider, symbol=symbol, reason=reason[:200]))
+
+    def _load(self, symbol: str) -> None:
+        series = PriceSeries.query.filter_by(provider=self.provider, symbol=symbol).first()
+        if series is None:
+            return
+        rows = (
+            PriceBar.query.with_entities(PriceBar.date, PriceBar.close)
+            .filter_by(provider=self.provider, symbol=symbol)
+            .order_by(PriceBar.date)
+            .all()
+        )
+        self._dates[symbol] = [row[0] for row in rows]
+        self._closes[symbol] = [row[1] for row in rows]
+        self._coverage[symbol] = (series.start_date, series.end_date)
+
+    def _fetch(self, symbol: str, start_date: date, end_date: date) -> Optional[Bars]:
+        self.requests += 1
+        if self.provider == "alpha_vantage":
+            return _alpha_vantage_history(symbol)
+        return _yahoo_history(symbol, start_date, end_date)
+
+    def _store(self, symbol: str, gap_start: date, gap_end: date, bars: Bars) -> None:
+        # Alpha Vantage always returns the symbol's full history
+        lo = date.min if self.provider == "alpha_vantage" else gap_start
+        hi = max([gap_end] + [day for day, _ in bars])
+
+        PriceBar.query.filter(
+            PriceBar.provider == self.provider,
+            PriceBar.symbol == symbol,
+            PriceBar.date >= lo,
+            PriceBar.date <= hi,
+        ).delete(synchronize_session=False)
+        db.session.bulk_insert_mappings(
+            PriceBar,
+            [{"provider": self.provider, "symbol": symbol, "date": day, "close": close} for day, close in bars],
+        )
+
+        merged = dict(zip(self._dates.get(symbol, []), self._closes.get(symbol, [])))
+        merged.update(bars)
+        ordered = sorted(merged.items())
+        self._dates[symbol] = [day for day, _ in ordered]
+        self._closes[symbol] = [close for _, close in ordered]
+
+        coverage = self._coverage.get(symbol)
+        self._coverage[symbol] = (min(coverage[0], lo), max(coverage[1], hi)) if coverage else (lo, hi)
+
+        # Today's bar may still change, so only completed days count as covered
+        # in the table and the next run fetches the rest again
+        persist_hi = min(hi, date.today() - ONE_DAY)
+        if persist_hi < lo:
+            return
+        series = PriceSeries.query.filter_by(provider=self.provider, symbol=symbol).first()
+        if series is None:
+            series = PriceSeries(provider=self.provider, symbol=symbol, start_date=lo, end_date=persist_hi)
+            db.session.add(series)
+        else:
+            series.start_date = min(series.start_date, lo)
+            series.end_date = max(series.end_date, persist_hi)
+        series.fetched_at = datetime.utcnow()
+
+
+def pack_series(series: Sequence[Tuple[List[date], List[float]]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Flatten per-symbol (dates, closes) into sorted keys, closes and segment offsets."""
+    lengths = np.array([len(dates) for dates, _ in series], dtype=np.int64)
+    segment_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(series) else lengths
+    total = int(lengths.sum())
+    keys = np.fromiter(
+        (i * KEY_STRIDE + day.toordinal() for i, (dates, _) in enumerate(series) for day in dates),
+        dtype=np.int64,
+        count=total,
+    )
+    closes = np.fromiter((close for _, values in series for close in values), dtype=np.float64, count=total)
+    return keys, closes, segment_starts
+
+
+def score_windows(
+    keys: np.ndarray,
+    closes: np.ndarray,
+    segment_starts: np.ndarray,
+    symbol_idx: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    as_of: bool = False,
+) -> np.ndarray:
+    """Window returns for every (symbol index, start ordinal, end ordinal).
+
+    Series only ever hold real closes (missing ones are dropped when bars
+    are loaded). By default a window's return runs from the first to the
+    last close in [start, end) (Yahoo); with as_of it runs between the last
+    closes on or before each end (Alpha Vantage). Windows without a return
+    are NaN.
+    """
+    returns = np.full(len(symbol_idx), np.nan)
+    if not len(keys) or not len(symbol_idx):
+        return returns
+
+    base = symbol_idx * KEY_STRIDE
+    if as_of:
+        first = np.searchsorted(keys, base + starts, side="right") - 1
+        last = np.searchsorted(keys, base + ends, side="right") - 1
+        valid = first >= segment_starts[symbol_idx]
+    else:
+        first = np.searchsorted(keys, base + starts, side="left")
+        last = np.searchsorted(keys, base + ends, side="left") - 1
+        valid = last - first >= 1
+
+    first = first[valid]
+    last = last[valid]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns[valid] = (closes[last] - closes[first]) / closes[first]
+    return returns
+
+
+def date_ordinals(days: Sequence[date]) -> np.ndarray:
+    return np.fromiter((day.toordinal() for day in days), dtype=np.int64, count=len(days))
 
-def get_price_change(symbol: str, start_date, end_date) -> Optional[float]:
-    if not symbol:
-        return None
 
-    provider = current_app.config.get("MARKET_DATA_PROVIDER", "yahoo")
-    if provider == "alpha_vantage":
-        return _alpha_vantage_change(symbol, start_date, end_date)
-    return _yahoo_change(symbol, start_date, end_date)
+def _gaps(coverage: Optional[Tuple[date, date]], start: date, end: date) -> List[Tuple[date, date]]:
+    """Date ranges between start and end that coverage does not include."""
+    if coverage is None:
+        return [(start, end)]
+    covered_start, covered_end = coverage
+    gaps = []
+    if start < covered_start:
+        gaps.append((start, covered_start - ONE_DAY))
+    if end > covered_end:
+        gaps.append((covered_end + ONE_DAY, end))
+    return gaps
 
 
-def _yahoo_change(symbol: str, start_date, end_date) -> Optional[float]:
+def _yahoo_history(symbol: str, start_date, end_date) -> Optional[Bars]:
     try:
         start_ts = int(datetime.combine(start_date, datetime.min.time()).timestamp())
-        end_ts = int(datetime.combine(end_date, datetime.min.time()).timestamp())
+        end_ts = int(datetime.combine(end_date + ONE_DAY, datetime.min.time()).timestamp())
     except Exception:
         return None
 
@@ -31,45 +257,54 @@ def _yahoo_change(symbol: str, start_date, end_date) -> Optional[float]:
     )
 
     try:
-        resp = requests.get(url, timeout=10)
+        wait_for_slot(url)
+        resp = get_session().get(url, timeout=10)
+        if resp.status_code == 404:
+            raise SymbolNotFound("not found")
         resp.raise_for_status()
-        data = resp.json()
-        closes = data["chart"]["result"][0]["indicators"]["quote"][0]["close"]
-        closes = [c for c in closes if c is not None]
-        if len(closes) < 2:
-            return None
-        return (closes[-1] - closes[0]) / closes[0]
+        chart = resp.json()["chart"]
+        if not chart.get("result"):
+            raise SymbolNotFound((chart.get("error") or {}).get("description") or "empty result")
+        result = chart["result"][0]
+        # Bars are stamped at the exchange's open; shift to its local date
+        offset = result.get("meta", {}).get("gmtoffset", 0)
+        timestamps = result.get("timestamp") or []
+        closes = result["indicators"]["quote"][0].get("close") or []
+        return [
+            (datetime.utcfromtimestamp(ts + offset).date(), float(close))
+            for ts, close in zip(timestamps, closes)
+            if close is not None
+        ]
+    except SymbolNotFound:
+        raise
     except Exception as exc:
         logger.warning("Yahoo price fetch failed for %s: %s", symbol, exc)
         return None
 
 
-def _alpha_vantage_change(symbol: str, start_date, end_date) -> Optional[float]:
+def _alpha_vantage_history(symbol: str) -> Optional[Bars]:
     api_key = current_app.config.get("ALPHA_VANTAGE_API_KEY", "")
     if not api_key:
         return None
 
     url = (
         "https://www.alphavantage.co/query?function=TIME_SERIES_DAILY_ADJUSTED"
-        f"&symbol={symbol}&apikey={api_key}"
+        f"&symbol={symbol}&outputsize=full&apikey={api_key}"
     )
 
     try:
-        resp = requests.get(url, timeout=10)
+        wait_for_slot(url)
+        resp = get_session().get(url, timeout=10)
         resp.raise_for_status()
-        data = resp.json().get("Time Series (Daily)", {})
-        dates = sorted(data.keys())
-        if not dates:
-            return None
-
-        start_key = max([d for d in dates if d <= start_date.isoformat()], default=None)
-        end_key = max([d for d in dates if d <= end_date.isoformat()], default=None)
-        if not start_key or not end_key:
-            return None
-
-        start_close = float(data[start_key]["4. close"])
-        end_close = float(data[end_key]["4. close"])
-        return (end_close - start_close) / start_close
+        payload = resp.json()
+        if "Error Message" in payload:
+            raise SymbolNotFound(payload["Error Message"])
+        data = payload.get("Time Series (Daily)", {})
+        return sorted(
+            (date.fromisoformat(day), float(values["4. close"])) for day, values in data.items()
+        )
+    except SymbolNotFound:
+        raise
     except Exception as exc:
         logger.warning("Alpha Vantage price fetch failed for %s: %s", symbol, exc)
         return None
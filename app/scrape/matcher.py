@@ -0,0 +1,72 @@
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+
+class NameMatcher:
+    """Aho-Corasick automaton over normalized politician names.
+
+    Finds every roster name occurring in a normalized line in one pass over
+    the line, instead of one substring test per politician. Matches are
+    ranked like the old scan: longest name first, ties broken by the larger
+    original name.
+    """
+
+    def __init__(self, full_name_index: Dict[str, str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Best (length, original) match ending at each state, including
+        # matches reachable through the failure links
+        self._best: List[Optional[Tuple[int, str]]] = [None]
+
+        for normalized, original in full_name_index.items():
+            if not normalized:
+                continue
+            state = 0
+            for char in normalized:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(None)
+                state = nxt
+            self._best[state] = _better(self._best[state], (len(normalized), original))
+
+        self._link()
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._best[nxt] = _better(self._best[nxt], self._best[self._fail[nxt]])
+                queue.append(nxt)
+
+    def longest_match(self, normalized_line: str) -> Optional[str]:
+        goto = self._goto
+        fail = self._fail
+        best_by_state = self._best
+        state = 0
+        best = None
+        for char in normalized_line:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            candidate = best_by_state[state]
+            if candidate is not None and (best is None or candidate > best):
+                best = candidate
+        return best[1] if best else None
+
+
+def _better(a: Optional[Tuple[int, str]], b: Optional[Tuple[int, str]]) -> Optional[Tuple[int, str]]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return a if a > b else b
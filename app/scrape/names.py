@@ -0,0 +1,192 @@
+import hashlib
+import logging
+import os
+import pickle
+import re
+from typing import Dict, Iterable, List, Optional
+from ..config import get_setting
+from .fuzzy import TrigramIndex
+from .matcher import NameMatcher
+from .utils import NAME_TOKEN_RE, SPEAKER_RE, SPEAKER_WITH_INITIAL_RE, normalize_name
+
+
+logger = logging.getLogger("politracker")
+
+# Bump whenever the lookup tables change shape so stale pickles are rebuilt
+RESOLVER_VERSION = 2
+
+# Post-nominals and joining words in roster names ("Senator the Hon Penny
+# Wong", "Hon Anthony Albanese MP") that never appear in speaker lines
+NAME_AFFIXES = frozenset(("the", "mp", "am", "ao", "ac", "sc", "csc", "oam", "qc", "kc"))
+SPEAKER_PREFIX_RE = re.compile(r"^(?:Senator|Mr|Ms|Mrs|Dr|Hon)\s+(.+)$")
+SPEAKER_HEAD_END_RE = re.compile(r"[(:\u2014\u2013]")
+
+
+class NameResolver:
+    """Every way the scrapers look up a politician name, built once.
+
+    Covers normalized full names, surnames, first initial plus surname and
+    "Surname, Given" register headings, and finds names inside free text
+    with an Aho-Corasick matcher. A trigram index over the same keys backs
+    the fuzzy fallbacks for names mangled by PDF extraction. All lookups
+    return the roster name.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = list(dict.fromkeys(names))
+        self.by_full: Dict[str, str] = {}
+        self.by_first_last: Dict[str, str] = {}
+        self.by_surname: Dict[str, List[str]] = {}
+        self.by_initial_surname: Dict[str, List[str]] = {}
+        self.fuzzy = TrigramIndex()
+
+        for name in self.names:
+            normalized = normalize_name(name)
+            if not normalized:
+                continue
+            self.by_full[normalized] = name
+            tokens = _core_tokens(normalized)
+            if not tokens:
+                continue
+            self.by_full.setdefault(" ".join(tokens), name)
+            self.by_first_last.setdefault(f"{tokens[0]} {tokens[-1]}", name)
+            self.by_surname.setdefault(tokens[-1], []).append(name)
+            self.by_initial_surname.setdefault(f"{tokens[0][0]} {tokens[-1]}", []).append(name)
+            self.fuzzy.add(" ".join(tokens), name)
+            self.fuzzy.add(f"{tokens[0]} {tokens[-1]}", name)
+            self.fuzzy.add(tokens[-1], name)
+
+        self.matcher = NameMatcher(self.by_full)
+
+    def resolve_full(self, text: str) -> Optional[str]:
+        normalized = normalize_name(text)
+        if not normalized:
+            return None
+        name = self.by_full.get(normalized)
+        if name is None:
+            tokens = _core_tokens(normalized)
+            if tokens:
+                name = self.by_full.get(" ".join(tokens))
+        return name
+
+    def resolve_surname_given(self, line: str) -> Optional[str]:
+        """Resolve a "Surname, Given [Middle]" heading."""
+        if "," not in line:
+            return None
+        surname, given = (part.strip() for part in line.split(",", 1))
+        given_parts = given.split()
+        if not surname or not given_parts:
+            return None
+        tokens = _core_tokens(normalize_name(f"{given_parts[0]} {surname}"))
+        if len(tokens) < 2:
+            return None
+        return self.by_first_last.get(f"{tokens[0]} {tokens[-1]}")
+
+    def resolve_speaker(self, line: str) -> Optional[str]:
+        """Resolve "Mr Albanese" or "Senator P Wong" style speaker lines."""
+        if not line:
+            return None
+        match = SPEAKER_RE.match(line)
+        if not match:
+            return None
+        candidates = self.by_surname.get(match.group(2).lower(), [])
+        if len(candidates) == 1:
+            return candidates[0]
+        if not candidates:
+            return None
+        # Several members share the surname; use the given-name initial
+        initial_match = SPEAKER_WITH_INITIAL_RE.match(line)
+        if initial_match:
+            key = f"{initial_match.group(2).lower()} {initial_match.group(3).lower()}"
+            initial_candidates = self.by_initial_surname.get(key, [])
+            if initial_candidates:
+                return initial_candidates[0]
+        return None
+
+    def resolve_fuzzy(self, text: str, threshold: Optional[float] = None) -> Optional[str]:
+        """Best fuzzy match for a name field, or None below threshold.
+
+        Also None when the top two candidates tie, since guessing between
+        two politicians is worse than not matching.
+        """
+        if threshold is None:
+            threshold = get_setting("FUZZY_NAME_THRESHOLD", 0.6)
+        tokens = _core_tokens(normalize_name(text))
+        if not tokens:
+            return None
+        ranked = self.fuzzy.search(" ".join(tokens), limit=2)
+        if not ranked or ranked[0][1] < threshold:
+            return None
+        if len(ranked) > 1 and ranked[1][1] == ranked[0][1]:
+            return None
+        return ranked[0][0]
+
+    def resolve_speaker_fuzzy(self, line: str, threshold: Optional[float] = None) -> Optional[str]:
+        """Fuzzy fallback for speaker lines whose name was split or mangled.
+
+        Only the few words after the title are compared, up to the first
+        bracket or colon, so the rest of the sentence doesn't dilute the
+        score.
+        """
+        match = SPEAKER_PREFIX_RE.match(line or "")
+        if not match:
+            return None
+        head = SPEAKER_HEAD_END_RE.split(match.group(1), 1)[0]
+        words = head.split()[:3]
+        if not words:
+            return None
+        return self.resolve_fuzzy(" ".join(words), threshold)
+
+    def detect_in_line(self, line: str) -> Optional[str]:
+        if not line:
+            return None
+        normalized_line = normalize_name(line)
+        if not normalized_line:
+            return None
+        # Prefer longest match to reduce false positives
+        return self.matcher.longest_match(normalized_line)
+
+
+def load_name_resolver(names: Iterable[str]) -> NameResolver:
+    """Return a NameResolver for names, reusing the copy saved in instance/.
+
+    Saved resolvers are keyed by a hash of POLITICIANS_CSV and
+    RESOLVER_VERSION, and are rebuilt if their names differ from the roster
+    (for example when the database was seeded from an older CSV).
+    """
+    names = list(dict.fromkeys(names))
+    path = _resolver_path()
+    if path and os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                resolver = pickle.load(f)
+            if isinstance(resolver, NameResolver) and resolver.names == names:
+                return resolver
+        except Exception as exc:
+            logger.warning("Ignoring unreadable name resolver %s: %s", path, exc)
+
+    resolver = NameResolver(names)
+    if path:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(resolver, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as exc:
+            logger.warning("Could not save name resolver %s: %s", path, exc)
+    return resolver
+
+
+def _resolver_path() -> Optional[str]:
+    cache_dir = get_setting("NAME_RESOLVER_DIR")
+    csv_path = get_setting("POLITICIANS_CSV", "data/politicians.csv")
+    if not cache_dir or not csv_path or not os.path.exists(csv_path):
+        return None
+    with open(csv_path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"name_resolver-v{RESOLVER_VERSION}-{digest}.pickle")
+
+
+def _core_tokens(normalized: str) -> List[str]:
+    return [token for token in NAME_TOKEN_RE.findall(normalized) if token not in NAME_AFFIXES]
@@ -0,0 +1,146 @@
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Iterator, List, Optional, Set, Tuple
+from PyPDF2 import PdfReader
+from ..config import get_setting
+
+
+logger = logging.getLogger("politracker")
+
+
+class PendingDocument:
+    """Text extraction for one PDF, split into page ranges.
+
+    iter_pages() yields page texts in page order no matter which worker
+    finishes first, and drops each range's text once it has been yielded.
+    """
+
+    def __init__(self, source_url: str, path: str, page_count: int, ranges: List[Tuple[int, int]], extractor=None):
+        self.source_url = source_url
+        self.page_count = page_count
+        self._path = path
+        self._ranges = ranges
+        # Set when running on the pool, which queues the ranges
+        self._extractor = extractor
+        self._futures: Dict[int, Future] = {}
+        self._started: Set[int] = set()
+        self._cancelled = False
+
+    def iter_pages(self) -> Iterator[str]:
+        for index, (start, stop) in enumerate(self._ranges):
+            if self._extractor is None:
+                texts, errors = extract_page_range(self._path, start, stop)
+            else:
+                texts, errors = self._extractor.take(self, index)
+            for page_number, message in errors:
+                logger.warning("PDF page %s unreadable in %s: %s", page_number, self.source_url, message)
+            yield from texts
+
+    def cancel(self):
+        self._cancelled = True
+        if self._extractor is not None:
+            self._extractor.release(self)
+
+
+class PdfTextExtractor:
+    """Runs PyPDF2 text extraction on a process pool.
+
+    Each submitted document is split into PDF_PAGES_PER_CHUNK page ranges,
+    and ranges from all submitted documents are queued in order so a single
+    large volume is spread over the PDF_WORKERS processes as well as
+    separate documents. At most one range per worker is extracted ahead of
+    the reader, so memory holds a few chunks of text rather than whole
+    volumes. With one worker everything runs in-process.
+    """
+
+    def __init__(self, workers: Optional[int] = None, pages_per_chunk: Optional[int] = None):
+        self.workers = max(1, workers or get_setting("PDF_WORKERS") or os.cpu_count() or 1)
+        self.pages_per_chunk = max(1, pages_per_chunk or get_setting("PDF_PAGES_PER_CHUNK", 16))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # (document, range index) not yet handed to the pool
+        self._queue: Deque[Tuple[PendingDocument, int]] = deque()
+        self._in_flight = 0
+        if self.workers > 1:
+            # spawn rather than fork: the fetch threads may be holding locks
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+
+    def submit(self, path: str, source_url: str) -> PendingDocument:
+        page_count = len(PdfReader(path).pages)
+        ranges = [
+            (start, min(start + self.pages_per_chunk, page_count))
+            for start in range(0, page_count, self.pages_per_chunk)
+        ]
+        if self._executor is None:
+            return PendingDocument(source_url, path, page_count, ranges)
+        document = PendingDocument(source_url, path, page_count, ranges, self)
+        self._queue.extend((document, index) for index in range(len(ranges)))
+        self._fill()
+        return document
+
+    def take(self, document: PendingDocument, index: int) -> Tuple[List[str], List[Tuple[int, str]]]:
+        """Wait for one range of document, then queue the next range in line."""
+        future = document._futures.pop(index, None)
+        if future is None:
+            # Read ahead of the queue; extract it now rather than wait
+            future = self._start(document, index)
+        try:
+            return future.result()
+        finally:
+            self._in_flight -= 1
+            self._fill()
+
+    def release(self, document: PendingDocument):
+        """Cancel a document's queued ranges and free their slots."""
+        for future in document._futures.values():
+            future.cancel()
+            self._in_flight -= 1
+        document._futures.clear()
+        self._fill()
+
+    def _fill(self):
+        while self._queue and self._in_flight < self.workers:
+            document, index = self._queue.popleft()
+            if document._cancelled or index in document._started:
+                continue
+            document._futures[index] = self._start(document, index)
+
+    def _start(self, document: PendingDocument, index: int) -> Future:
+        start, stop = document._ranges[index]
+        document._started.add(index)
+        self._in_flight += 1
+        return self._executor.submit(extract_page_range, document._path, start, stop)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self._queue.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def extract_page_range(path: str, start: int, stop: int) -> Tuple[List[str], List[Tuple[int, str]]]:
+    """Extract text for pages [start, stop); runs inside worker processes.
+
+    Returns the page texts plus (page_number, error) pairs for pages that
+    could not be read, since worker processes have no log handlers.
+    """
+    reader = PdfReader(path)
+    texts = []
+    errors = []
+    for index in range(start, stop):
+        try:
+            texts.append(reader.pages[index].extract_text() or "")
+        except Exception as exc:
+            texts.append("")
+            errors.append((index + 1, str(exc)))
+    return texts, errors
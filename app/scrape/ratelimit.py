@@ -0,0 +1,83 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+from ..config import get_setting
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it.
+
+        Tokens refill continuously, so time the caller spent parsing since
+        its last request already counts toward the next one.
+        """
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class HostRateLimiter:
+    def __init__(self):
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url: str, crawl_delay: Optional[float] = None) -> float:
+        host = urlsplit(url).netloc.lower()
+        rate, burst = _limits_for(host, crawl_delay)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(rate, burst)
+                self._buckets[host] = bucket
+            elif bucket.rate != rate or bucket.capacity != burst:
+                bucket.rate = rate
+                bucket.capacity = max(1, burst)
+                bucket.tokens = min(bucket.tokens, bucket.capacity)
+            wait = bucket.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+_limiter = HostRateLimiter()
+
+
+def wait_for_slot(url: str, crawl_delay: Optional[float] = None) -> float:
+    return _limiter.acquire(url, crawl_delay)
+
+
+def reset_limits():
+    _limiter.reset()
+
+
+def _limits_for(host: str, crawl_delay: Optional[float]) -> Tuple[float, int]:
+    overrides = get_setting("RATE_LIMIT_HOSTS", {}) or {}
+    rate, burst = overrides.get(
+        host,
+        (get_setting("RATE_LIMIT_PER_SEC", 0.5), get_setting("RATE_LIMIT_BURST", 1)),
+    )
+    if crawl_delay:
+        crawl_rate = 1.0 / crawl_delay
+        if rate <= 0 or crawl_rate < rate:
+            rate = crawl_rate
+        burst = 1
+    return rate, burst
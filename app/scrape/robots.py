@@ -0,0 +1,165 @@
+import json
+import logging
+import os
+import threading
+import time
+import urllib.robotparser
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+from ..config import get_setting
+from .session import get_session
+
+
+logger = logging.getLogger("politracker")
+
+# Entries are keyed by "scheme://host" and hold the raw robots.txt lines so
+# they can be written to disk and rebuilt into a parser on the next run.
+_entries: Dict[str, Dict] = {}
+_parsers: Dict[str, urllib.robotparser.RobotFileParser] = {}
+_key_locks: Dict[str, threading.Lock] = {}
+_lock = threading.Lock()
+_disk_loaded = False
+
+
+def robots_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+def is_allowed(url: str, user_agent: str) -> bool:
+    parser = get_policy(url, user_agent)
+    if parser is None:
+        return True
+    return parser.can_fetch(user_agent, url)
+
+
+def get_crawl_delay(url: str, user_agent: str) -> Optional[float]:
+    parser = get_policy(url, user_agent)
+    if parser is None:
+        return None
+    try:
+        delay = parser.crawl_delay(user_agent)
+    except Exception:
+        return None
+    return float(delay) if delay is not None else None
+
+
+def get_policy(url: str, user_agent: str) -> Optional[urllib.robotparser.RobotFileParser]:
+    """Return the cached robots.txt policy for the URL's host.
+
+    The policy is downloaded at most once per host per
+    ROBOTS_CACHE_TTL_SECS, or ROBOTS_FAILURE_TTL_SECS after a failed
+    fetch. None means robots.txt could not be fetched.
+    """
+    key = robots_key(url)
+    with _lock:
+        _load_disk_cache()
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    with key_lock:
+        entry = _entries.get(key)
+        if entry is None or _is_expired(entry):
+            entry = _download(key, user_agent)
+            with _lock:
+                _entries[key] = entry
+                _parsers.pop(key, None)
+                if entry.get("persist"):
+                    _save_disk_cache()
+
+        if entry.get("status") is None:
+            return None
+
+        parser = _parsers.get(key)
+        if parser is None:
+            parser = _build_parser(key, entry)
+            _parsers[key] = parser
+        return parser
+
+
+def clear_cache():
+    global _disk_loaded
+    with _lock:
+        _entries.clear()
+        _parsers.clear()
+        _disk_loaded = False
+
+
+def _is_expired(entry: Dict) -> bool:
+    # Only real answers are persisted; failures are retried after a short while
+    if entry.get("persist"):
+        ttl = get_setting("ROBOTS_CACHE_TTL_SECS", 86400)
+    else:
+        ttl = get_setting("ROBOTS_FAILURE_TTL_SECS", 300)
+    return time.time() - entry.get("fetched_at", 0) >= ttl
+
+
+def _download(key: str, user_agent: str) -> Dict:
+    robots_url = f"{key}/robots.txt"
+    timeout = get_setting("REQUEST_TIMEOUT_SECS", 20)
+    try:
+        resp = get_session().get(robots_url, headers={"User-Agent": user_agent}, timeout=timeout)
+    except Exception as exc:
+        logger.warning("robots.txt fetch failed for %s; proceeding cautiously: %s", robots_url, exc)
+        return {"fetched_at": time.time(), "status": None, "lines": [], "persist": False}
+
+    lines: List[str] = []
+    if resp.status_code < 400:
+        lines = resp.content.decode("utf-8", errors="ignore").splitlines()
+    # Server errors are not worth remembering between runs
+    persist = resp.status_code < 500
+    return {"fetched_at": time.time(), "status": resp.status_code, "lines": lines, "persist": persist}
+
+
+def _build_parser(key: str, entry: Dict) -> urllib.robotparser.RobotFileParser:
+    # Mirrors RobotFileParser.read(): auth errors and server errors block
+    # the host, other client errors mean there is no robots.txt at all.
+    parser = urllib.robotparser.RobotFileParser(f"{key}/robots.txt")
+    status = entry["status"]
+    if status in (401, 403) or status >= 500:
+        parser.disallow_all = True
+    elif status >= 400:
+        parser.allow_all = True
+    else:
+        parser.parse(entry.get("lines", []))
+    parser.modified()
+    return parser
+
+
+def _load_disk_cache():
+    global _disk_loaded
+    if _disk_loaded:
+        return
+    _disk_loaded = True
+
+    path = get_setting("ROBOTS_CACHE_PATH", "")
+    if not path or not os.path.exists(path):
+        return
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except Exception as exc:
+        logger.warning("Ignoring unreadable robots cache %s: %s", path, exc)
+        return
+
+    for key, entry in payload.items():
+        if key not in _entries and not _is_expired(entry):
+            _entries[key] = dict(entry, persist=True)
+
+
+def _save_disk_cache():
+    path = get_setting("ROBOTS_CACHE_PATH", "")
+    if not path:
+        return
+    payload = {
+        key: {"fetched_at": entry["fetched_at"], "status": entry["status"], "lines": entry["lines"]}
+        for key, entry in _entries.items()
+        if entry.get("persist")
+    }
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+    except Exception as exc:
+        logger.warning("Could not write robots cache %s: %s", path, exc)
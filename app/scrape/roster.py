@@ -0,0 +1,51 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from ..models import Politician
+from .names import NameResolver, load_name_resolver
+from .utils import normalize_name
+
+
+class Roster:
+    """Politician names and ids, loaded once per pipeline run.
+
+    Shared by the register and Hansard scrapers so that matching a name to
+    a politician never needs a query per parsed line.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, str, Optional[str]]], resolver: Optional[NameResolver] = None):
+        self.ids_by_name: Dict[str, int] = {}
+        self.ids_by_normalized: Dict[str, int] = {}
+        self.ids_by_aph_id: Dict[str, int] = {}
+        # Rows arrive in id order; like filter_by(name=...).first(), the
+        # lowest id wins when two politicians share a name
+        for pol_id, name, aph_id in rows:
+            self.ids_by_name.setdefault(name, pol_id)
+            normalized = normalize_name(name)
+            if normalized:
+                self.ids_by_normalized.setdefault(normalized, pol_id)
+            if aph_id:
+                self.ids_by_aph_id.setdefault(aph_id, pol_id)
+
+        self.names: List[str] = list(self.ids_by_name)
+        self.resolver = resolver if resolver is not None else NameResolver(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def id_for_name(self, name: Optional[str]) -> Optional[int]:
+        if not name:
+            return None
+        pol_id = self.ids_by_name.get(name)
+        if pol_id is None:
+            pol_id = self.ids_by_normalized.get(normalize_name(name))
+        return pol_id
+
+    def id_for_aph_id(self, aph_id: Optional[str]) -> Optional[int]:
+        if not aph_id:
+            return None
+        return self.ids_by_aph_id.get(aph_id)
+
+
+def load_roster() -> Roster:
+    rows = Politician.query.with_entities(Politician.id, Politician.name, Politician.aph_id).order_by(Politician.id).all()
+    names = [name for _, name, _ in rows]
+    return Roster(rows, load_name_resolver(names))
@@ -0,0 +1,90 @@
+import re
+from typing import Optional, Sequence, Tuple
+
+
+# Bump when any rule below changes, so stored sector masks and past
+# correlation runs are known to be stale
+TAXONOMY_VERSION = 1
+
+# Bit per sector, with the words that put a holding in it. A policy is in
+# a sector when its category names the sector; a pair is a candidate when
+# the two masks share a bit.
+SECTORS = (
+    ("mining", 1, ("mining", "coal", "iron", "ore", "gas")),
+    ("energy", 2, ("energy", "oil", "gas", "renewable", "solar")),
+    ("banking", 4, ("bank", "financial", "insurance")),
+    ("property", 8, ("property", "real estate", "housing")),
+)
+
+# Hansard titles, first match wins
+POLICY_CATEGORY_RULES = (
+    ("mining", ("mining", "coal")),
+    ("energy", ("energy", "renewable")),
+    ("banking", ("bank", "finance")),
+    ("property", ("housing", "property")),
+)
+
+# Register sections plus the asset line, first match wins
+SECTION_ASSET_RULES = (
+    ("property", ("real estate", "property")),
+    ("equity", ("share", "company", "equity")),
+    ("trust", ("trust",)),
+    ("fixed income", ("bond", "debenture")),
+    ("liability", ("liability", "debt")),
+)
+
+# The asset line on its own
+ASSET_RULES = (
+    ("property", ("property", "real estate")),
+    ("equity", ("share", "stock", "equity")),
+    ("trust", ("trust",)),
+)
+
+
+def _compile(words: Sequence[str]) -> "re.Pattern":
+    # Plain substring alternation, so matching is the same as `word in text`
+    return re.compile("|".join(re.escape(word) for word in words))
+
+
+_SECTOR_PATTERNS = tuple((name, bit, _compile(words)) for name, bit, words in SECTORS)
+_POLICY_CATEGORY_PATTERNS = tuple((label, _compile(words)) for label, words in POLICY_CATEGORY_RULES)
+_SECTION_ASSET_PATTERNS = tuple((label, _compile(words)) for label, words in SECTION_ASSET_RULES)
+_ASSET_PATTERNS = tuple((label, _compile(words)) for label, words in ASSET_RULES)
+
+
+def policy_sectors(category: Optional[str]) -> int:
+    if not category:
+        return 0
+    category = category.lower()
+    mask = 0
+    for name, bit, _ in _SECTOR_PATTERNS:
+        if name in category:
+            mask |= bit
+    return mask
+
+
+def investment_sectors(asset_type: Optional[str], company: Optional[str]) -> int:
+    asset_text = " ".join([asset_type or "", company or ""]).lower()
+    mask = 0
+    for _, bit, pattern in _SECTOR_PATTERNS:
+        if pattern.search(asset_text):
+            mask |= bit
+    return mask
+
+
+def infer_policy_category(text: str) -> str:
+    return _first_label(_POLICY_CATEGORY_PATTERNS, text.lower()) or "other"
+
+
+def infer_asset_type(section: str, line: str) -> str:
+    label = _first_label(_SECTION_ASSET_PATTERNS, f"{section} {line}".lower())
+    if label:
+        return label
+    return _first_label(_ASSET_PATTERNS, line.lower()) or "declared asset"
+
+
+def _first_label(rules: Sequence[Tuple[str, "re.Pattern"]], text: str) -> Optional[str]:
+    for label, pattern in rules:
+        if pattern.search(text):
+            return label
+    return None
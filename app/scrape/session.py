@@ -0,0 +1,49 @@
+import threading
+from typing import Optional
+import requests
+from requests.adapters import HTTPAdapter
+from ..config import get_setting
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session shared by every scraper.
+
+    Connections are kept alive per host, so repeated requests to aph.gov.au
+    reuse the same TCP/TLS connection instead of handshaking each time.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def close_session():
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=get_setting("HTTP_POOL_CONNECTIONS", 10),
+        pool_maxsize=get_setting("HTTP_POOL_MAXSIZE", 10),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {
+            "User-Agent": get_setting("USER_AGENT"),
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        }
+    )
+    return session
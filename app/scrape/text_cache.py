@@ -0,0 +1,69 @@
+import gzip
+import os
+from typing import Iterable, Iterator, Optional
+from ..config import get_setting
+
+
+class TextCache:
+    """Gzip-compressed extracted text, keyed by the PDF's SHA-256."""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, content_hash: str) -> str:
+        return os.path.join(self.root, f"{content_hash}.txt.gz")
+
+    def has(self, content_hash: str) -> bool:
+        return os.path.exists(self.path(content_hash))
+
+    def iter_pages(self, content_hash: str) -> Iterator[str]:
+        # Lines are streamed back one at a time; the line parser does not
+        # care where the page breaks were
+        with gzip.open(self.path(content_hash), "rt", encoding="utf-8") as f:
+            for line in f:
+                yield line.rstrip("\n")
+
+    def tee(self, content_hash: str, pages: Iterable[str]) -> Iterator[str]:
+        """Yield pages unchanged while writing them to the cache.
+
+        The entry only appears once every page has been written, so a
+        failed extraction never leaves a partial text behind.
+        """
+        final_path = self.path(content_hash)
+        tmp_path = f"{final_path}.{os.getpid()}.part"
+        completed = False
+        try:
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                for text in pages:
+                    f.write(text)
+                    f.write("\n")
+                    yield text
+            completed = True
+            os.replace(tmp_path, final_path)
+        finally:
+            if not completed and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+class CachedDocument:
+    """Stands in for a PendingDocument when the text is already cached."""
+
+    def __init__(self, source_url: str, content_hash: str, page_count: Optional[int], cache: TextCache):
+        self.source_url = source_url
+        self.page_count = page_count
+        self._content_hash = content_hash
+        self._cache = cache
+
+    def iter_pages(self) -> Iterator[str]:
+        return self._cache.iter_pages(self._content_hash)
+
+    def cancel(self):
+        pass
+
+
+def get_text_cache() -> Optional[TextCache]:
+    root = get_setting("TEXT_CACHE_DIR")
+    if not root:
+        return None
+    return TextCache(root)
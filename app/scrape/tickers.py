@@ -0,0 +1,116 @@
+import csv
+import logging
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+from ..config import get_setting
+
+
+logger = logging.getLogger("politracker")
+
+COMPANY_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Legal-form words that never tell two listed companies apart
+COMPANY_SUFFIXES = frozenset(("the", "limited", "ltd", "plc", "inc", "incorporated", "pty", "nl"))
+EXPLICIT_TICKER_RE = re.compile(r"\bASX\s*[:\-]?\s*([A-Z0-9]{3,4})\b")
+# Bank balances and deposits name a bank without being a holding in it
+ACCOUNT_RE = re.compile(r"\b(?:accounts?|deposits?|savings)\b", re.IGNORECASE)
+# One-word aliases that are also ordinary words, products or place names.
+# They still resolve a line that is just the name, but are never picked
+# out of a longer line ("Coles loyalty card", "Westfield shopping centre").
+SCAN_STOPLIST = frozenset(("amp", "asx", "challenger", "cochlear", "coles", "iluka", "seek", "westfield"))
+
+
+class TickerIndex:
+    """Resolves register text to ASX ticker codes.
+
+    Investment.company holds the raw register line, so a company is looked
+    up by its exact text first, then by an explicit "ASX: XYZ" code, then by
+    its normalized form, and finally by scanning the line for the longest
+    known alias outside SCAN_STOPLIST. Lines about bank accounts or
+    deposits never resolve.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, str]]):
+        self.tickers = set()
+        self.by_exact: Dict[str, str] = {}
+        self.by_alias: Dict[str, str] = {}
+        for row in rows:
+            ticker = (row.get("ticker") or "").strip().upper()
+            company = (row.get("company") or "").strip()
+            if not ticker or not company:
+                continue
+            self.tickers.add(ticker)
+            aliases = [company] + [alias for alias in (row.get("aliases") or "").split("|")]
+            for alias in aliases:
+                alias = alias.strip()
+                if not alias:
+                    continue
+                self.by_exact.setdefault(alias.casefold(), ticker)
+                normalized = normalize_company(alias)
+                if normalized:
+                    self.by_alias.setdefault(normalized, ticker)
+
+        self._scan_aliases = set(self.by_alias) - SCAN_STOPLIST
+        self._max_alias_tokens = max((len(alias.split()) for alias in self._scan_aliases), default=0)
+        self._resolved: Dict[str, Optional[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def resolve(self, text: Optional[str]) -> Optional[str]:
+        if not text:
+            return None
+        if text not in self._resolved:
+            self._resolved[text] = self._resolve(text)
+        return self._resolved[text]
+
+    def _resolve(self, text: str) -> Optional[str]:
+        if ACCOUNT_RE.search(text):
+            return None
+        ticker = self.by_exact.get(text.strip().casefold())
+        if ticker:
+            return ticker
+
+        for code in EXPLICIT_TICKER_RE.findall(text):
+            if code in self.tickers:
+                return code
+
+        normalized = normalize_company(text)
+        if not normalized:
+            return None
+        ticker = self.by_alias.get(normalized)
+        if ticker:
+            return ticker
+        return self._scan(normalized.split())
+
+    def _scan(self, tokens: List[str]) -> Optional[str]:
+        # Longest alias wins, the earliest one on ties
+        best = None
+        best_len = 0
+        for start in range(len(tokens)):
+            longest = min(self._max_alias_tokens, len(tokens) - start)
+            for length in range(longest, best_len, -1):
+                alias = " ".join(tokens[start : start + length])
+                if alias in self._scan_aliases:
+                    best, best_len = self.by_alias[alias], length
+                    break
+        return best
+
+
+def normalize_company(text: str) -> str:
+    tokens = COMPANY_TOKEN_RE.findall(text.lower().replace("&", " and ").replace("'", ""))
+    return " ".join(token for token in tokens if token not in COMPANY_SUFFIXES)
+
+
+def market_symbol(ticker: str) -> str:
+    """Provider symbol for an ASX code, e.g. BHP -> BHP.AX."""
+    return f"{ticker}{get_setting('TICKER_SYMBOL_SUFFIX', '.AX')}"
+
+
+def load_ticker_index(path: Optional[str] = None) -> TickerIndex:
+    path = path or get_setting("TICKERS_CSV", "data/asx_tickers.csv")
+    if not path or not os.path.exists(path):
+        logger.warning("Ticker list not found: %s", path)
+        return TickerIndex([])
+    with open(path, "r", encoding="utf-8") as f:
+        return TickerIndex(csv.DictReader(f))
@@ -1,40 +1,168 @@
 import hashlib
+import io
 import logging
+import os
 import re
+import tempfile
 import time
-import urllib.robotparser
 from datetime import datetime
-from typing import Optional, Dict, List, Tuple
-import requests
+from functools import lru_cache
+from typing import BinaryIO, Optional, Dict, Tuple
+from ..config import get_setting
+from . import robots
+from .http_cache import get_http_cache
+from .ratelimit import wait_for_slot
+from .sectors import investment_sectors, policy_sectors
+from .session import get_session
 
 
 logger = logging.getLogger("politracker")
 
+# A name token is a run of letters, apostrophes and hyphens; anything else
+# separates tokens
+NAME_TOKEN_RE = re.compile(r"[a-z'-]+")
+NAME_TITLES = frozenset(("mr", "ms", "mrs", "dr", "hon", "senator", "member"))
+SPEAKER_RE = re.compile(r"^(Senator|Mr|Ms|Mrs|Dr|Hon)\s+([A-Z][A-Za-z'\-]+)")
+SPEAKER_WITH_INITIAL_RE = re.compile(r"^(Senator|Mr|Ms|Mrs|Dr|Hon)\s+([A-Z])[A-Za-z'\-]+\s+([A-Z][A-Za-z'\-]+)")
+NORMALIZE_CACHE_SIZE = 65536
+
 
 def can_fetch(url: str, user_agent: str) -> bool:
     try:
-        rp = urllib.robotparser.RobotFileParser()
-        robots_url = _robots_url(url)
-        rp.set_url(robots_url)
-        rp.read()
-        return rp.can_fetch(user_agent, url)
+        return robots.is_allowed(url, user_agent)
     except Exception:
-        logger.warning("robots.txt fetch failed for %s; proceeding cautiously", url)
+        logger.warning("robots.txt check failed for %s; proceeding cautiously", url)
         return True
 
 
+class DownloadTooLarge(Exception):
+    pass
+
+
+class FetchResult:
+    """A fetched body, held in memory or in a file on disk.
+
+    Streamed downloads keep the body in a file the result owns (a pinned
+    link to the HTTP cache entry, or a temporary file) so large PDFs never
+    sit in memory and cache eviction cannot delete them mid-parse; use
+    open() to read them and close() to delete the file.
+    """
+
+    __slots__ = ("url", "changed", "from_cache", "sha256", "size", "path", "_content", "_owns_path")
+
+    def __init__(
+        self,
+        url: str,
+        changed: bool,
+        from_cache: bool,
+        sha256: str,
+        size: int,
+        content: Optional[bytes] = None,
+        path: Optional[str] = None,
+        owns_path: bool = False,
+    ):
+        self.url = url
+        # False when the server answered 304 or returned the same bytes as
+        # the cached copy, so callers can skip re-parsing
+        self.changed = changed
+        self.from_cache = from_cache
+        self.sha256 = sha256
+        self.size = size
+        self.path = path
+        self._content = content
+        self._owns_path = owns_path
+
+    @property
+    def content(self) -> Optional[bytes]:
+        if self._content is None and self.path:
+            with open(self.path, "rb") as f:
+                return f.read()
+        return self._content
+
+    def open(self) -> BinaryIO:
+        if self.path:
+            return open(self.path, "rb")
+        return io.BytesIO(self._content or b"")
+
+    def close(self):
+        if self._owns_path and self.path:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
 def fetch_url(url: str, user_agent: str, timeout: int, retries: int, delay: float) -> Optional[bytes]:
+    result = fetch_document(url, user_agent, timeout, retries, delay)
+    return result.content if result else None
+
+
+def fetch_document(
+    url: str,
+    user_agent: str,
+    timeout: int,
+    retries: int,
+    delay: float,
+    stream: bool = False,
+    max_bytes: Optional[int] = None,
+) -> Optional[FetchResult]:
+    """Fetch a URL through robots.txt, the rate limiter and the HTTP cache.
+
+    With stream=True the body is written to disk in chunks instead of being
+    loaded into memory, and transfers larger than max_bytes (default
+    DOWNLOAD_MAX_BYTES) are abandoned as soon as that becomes apparent.
+    """
     if not can_fetch(url, user_agent):
         logger.warning("Blocked by robots.txt: %s", url)
         return None
 
+    if stream and max_bytes is None:
+        max_bytes = get_setting("DOWNLOAD_MAX_BYTES")
+
+    cache = get_http_cache()
+    cached = cache.lookup(url) if cache else None
+    crawl_delay = robots.get_crawl_delay(url, user_agent)
     headers = {"User-Agent": user_agent}
+    if cache:
+        headers.update(cache.conditional_headers(cached))
+
     for attempt in range(1, retries + 1):
         try:
-            time.sleep(delay)
-            resp = requests.get(url, headers=headers, timeout=timeout)
-            resp.raise_for_status()
-            return resp.content
+            # delay is the back-off between retries; per-host pacing comes
+            # from the token bucket
+            if attempt > 1:
+                time.sleep(delay)
+            wait_for_slot(url, crawl_delay)
+            with get_session().get(url, headers=headers, timeout=timeout, stream=stream) as resp:
+                if resp.status_code == 304 and cached:
+                    result = _cached_result(cache, url, cached, stream)
+                    if result is not None:
+                        return result
+                    # The body vanished under us; ask again without validators
+                    headers = {"User-Agent": user_agent}
+                    cached = None
+                    continue
+                resp.raise_for_status()
+                if stream:
+                    result = _stream_to_disk(cache, url, resp, max_bytes)
+                elif cache:
+                    meta = cache.store(url, resp.headers, resp.content)
+                    result = FetchResult(url, True, False, meta["sha256"], meta["size"], content=resp.content)
+                else:
+                    digest = hashlib.sha256(resp.content).hexdigest()
+                    return FetchResult(url, True, False, digest, len(resp.content), content=resp.content)
+            result.changed = not cached or cached.get("sha256") != result.sha256
+            return result
+        except DownloadTooLarge as exc:
+            logger.warning("Download aborted %s: %s", url, exc)
+            return None
         except Exception as exc:
             logger.warning("Fetch failed (%s/%s) %s: %s", attempt, retries, url, exc)
             if attempt == retries:
@@ -42,6 +170,66 @@ def fetch_url(url: str, user_agent: str, timeout: int, retries: int, delay: floa
     return None
 
 
+def _cached_result(cache, url: str, meta: Dict, stream: bool) -> Optional[FetchResult]:
+    if stream:
+        path = cache.pin_body(url)
+        if path is None:
+            return None
+        return FetchResult(url, False, True, meta["sha256"], meta["size"], path=path, owns_path=True)
+    body = cache.read_body(url)
+    if body is None:
+        return None
+    return FetchResult(url, False, True, meta["sha256"], meta["size"], content=body)
+
+
+def _stream_to_disk(cache, url: str, resp, max_bytes: Optional[int]) -> FetchResult:
+    if cache:
+        handle, tmp_path = cache.new_body_file()
+    else:
+        handle = tempfile.NamedTemporaryFile(
+            dir=get_setting("DOWNLOAD_TMP_DIR") or None, suffix=".part", delete=False
+        )
+        tmp_path = handle.name
+
+    try:
+        with handle:
+            digest, size = _copy_body(resp, handle, max_bytes)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    if cache:
+        # Pin before commit: committing may evict this very entry
+        path = cache.pin_file(tmp_path)
+        meta = cache.commit(url, resp.headers, tmp_path, digest, size)
+        return FetchResult(url, True, False, meta["sha256"], meta["size"], path=path, owns_path=True)
+    return FetchResult(url, True, False, digest, size, path=tmp_path, owns_path=True)
+
+
+def _copy_body(resp, sink, max_bytes: Optional[int]) -> Tuple[str, int]:
+    declared = resp.headers.get("Content-Length", "")
+    declared_size = int(declared) if declared.isdigit() else None
+    if max_bytes and declared_size and declared_size > max_bytes:
+        raise DownloadTooLarge(f"Content-Length {declared_size} exceeds {max_bytes} bytes")
+
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in resp.iter_content(chunk_size=64 * 1024):
+        if not chunk:
+            continue
+        size += len(chunk)
+        if max_bytes and size > max_bytes:
+            raise DownloadTooLarge(f"body exceeds {max_bytes} bytes")
+        digest.update(chunk)
+        sink.write(chunk)
+
+    # Content-Length counts encoded bytes, so it can only be checked when
+    # the body was not gzip-decoded on the way in
+    if declared_size is not None and not resp.headers.get("Content-Encoding") and size != declared_size:
+        raise IOError(f"truncated transfer: got {size} of {declared_size} bytes")
+    return digest.hexdigest(), size
+
+
 def hash_text(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
@@ -56,107 +244,18 @@ def parse_date(date_str: str):
 
 
 def keyword_category_match(category: Optional[str], asset_type: Optional[str], company: Optional[str]) -> bool:
-    if not category:
-        return False
-    category = category.lower()
-    asset_text = " ".join([asset_type or "", company or ""]).lower()
-    keywords = {
-        "mining": ["mining", "coal", "iron", "ore", "gas"],
-        "energy": ["energy", "oil", "gas", "renewable", "solar"],
-        "banking": ["bank", "financial", "insurance"],
-        "property": ["property", "real estate", "housing"],
-    }
-
-    for key, words in keywords.items():
-        if key in category and any(word in asset_text for word in words):
-            return True
-    return False
-
-
-def _robots_url(url: str) -> str:
-    parts = url.split("/")
-    if len(parts) < 3:
-        return url
-    return f"{parts[0]}//{parts[2]}/robots.txt"
+    # Rows store these masks as sector_mask; this is the same test on raw text
+    return bool(policy_sectors(category) & investment_sectors(asset_type, company))
 
 
 def normalize_name(value: str) -> str:
     if not value:
         return ""
-    value = value.lower()
-    value = re.sub(r"[^a-z\\s'-]", " ", value)
-    value = re.sub(r"\\b(mr|ms|mrs|dr|hon|senator|member)\\b", " ", value)
-    value = re.sub(r"\\s+", " ", value).strip()
-    return value
-
-
-def build_name_index(names: List[str]) -> Dict[str, str]:
-    index = {}
-    for name in names:
-        normalized = normalize_name(name)
-        if normalized:
-            index[normalized] = name
-    return index
-
-
-def build_last_name_index(names: List[str]) -> Dict[str, List[str]]:
-    index: Dict[str, List[str]] = {}
-    for name in names:
-        normalized = normalize_name(name)
-        if not normalized:
-            continue
-        parts = normalized.split()
-        if not parts:
-            continue
-        last = parts[-1]
-        index.setdefault(last, []).append(name)
-    return index
+    return _normalize_name(value)
 
 
-def build_full_name_index(names: List[str]) -> Dict[str, str]:
-    index = {}
-    for name in names:
-        normalized = normalize_name(name)
-        if normalized:
-            index[normalized] = name
-    return index
-
-
-def detect_name_in_line(line: str, full_name_index: Dict[str, str]) -> Optional[str]:
-    if not line:
-        return None
-    normalized_line = normalize_name(line)
-    if not normalized_line:
-        return None
-    # Prefer longest match to reduce false positives
-    candidates: List[Tuple[int, str]] = []
-    for normalized, original in full_name_index.items():
-        if normalized and normalized in normalized_line:
-            candidates.append((len(normalized), original))
-    if not candidates:
-        return None
-    candidates.sort(reverse=True)
-    return candidates[0][1]
-
-
-def match_speaker_line(line: str, last_name_index: Dict[str, List[str]]) -> Optional[str]:
-    if not line:
-        return None
-    match = re.match(r"^(Senator|Mr|Ms|Mrs|Dr|Hon)\\s+([A-Z][A-Za-z'\\-]+)", line)
-    if not match:
-        return None
-    last = match.group(2).lower()
-    candidates = last_name_index.get(last, [])
-    if not candidates:
-        return None
-    if len(candidates) == 1:
-        return candidates[0]
-    # If multiple, try to match first initial from line
-    initial_match = re.match(r"^(Senator|Mr|Ms|Mrs|Dr|Hon)\\s+([A-Z])[A-Za-z'\\-]+\\s+([A-Z][A-Za-z'\\-]+)", line)
-    if initial_match:
-        first_initial = initial_match.group(2).lower()
-        for name in candidates:
-            parts = normalize_name(name).split()
-            if parts and parts[0].startswith(first_initial):
-                return name
-    return None
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize_name(value: str) -> str:
+    # One tokenizing pass: drop punctuation and digits, drop titles and
+    # collapse whitespace
+    return " ".join(token for token in NAME_TOKEN_RE.findall(value.lower()) if token not in NAME_TITLES)
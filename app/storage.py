@@ -0,0 +1,48 @@
+import sqlite3
+from typing import List, Tuple
+from sqlalchemy import event
+
+
+def sqlite_pragmas(config) -> List[Tuple[str, object]]:
+    """The SQLite storage profile, as (pragma, value) pairs in the order applied.
+
+    WAL lets the web app read while the pipeline writes, and with
+    synchronous=NORMAL a commit no longer waits for an fsync (a power loss
+    can drop the last commits, never corrupt the file). mmap and a larger
+    page cache keep the hot tables in memory; temp_store keeps sort and
+    index-build scratch space off disk.
+    """
+    return [
+        ("journal_mode", "WAL"),
+        ("synchronous", "NORMAL"),
+        ("mmap_size", int(config.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))),
+        # Negative cache_size is in KiB rather than pages
+        ("cache_size", -int(config.get("SQLITE_CACHE_SIZE_KB", 64 * 1024))),
+        ("temp_store", "MEMORY"),
+    ]
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: List[Tuple[str, object]]) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def init_storage(app, db) -> None:
+    """Apply the SQLite profile to every new connection of the app's engine."""
+    if not app.config.get("SQLITE_PRAGMAS_ENABLED", True):
+        return
+    if not app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+        return
+
+    pragmas = sqlite_pragmas(app.config)
+
+    def on_connect(dbapi_connection, connection_record):
+        if isinstance(dbapi_connection, sqlite3.Connection):
+            apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+    with app.app_context():
+        event.listen(db.engine, "connect", on_connect)
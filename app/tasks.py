@@ -1,13 +1,20 @@
 import logging
 import os
 from datetime import datetime, timedelta
+from typing import List, Optional
 from flask import current_app
+from sqlalchemy import func, or_
 from . import db
-from .models import Investment, Policy, Correlation, Politician
+from .analysis import InvestmentRow, PolicyRow, ScoringSettings, score_correlations
+from .models import Investment, Policy, Correlation, CorrelationWatermark
+from .response_cache import bump_generation
 from .scrape.aph_register import scrape_register_disclosures
 from .scrape.aph_hansard import scrape_hansard_updates
-from .scrape.market_data import get_price_change
-from .scrape.utils import keyword_category_match
+from .scrape.ingest import insert_ignoring_conflicts
+from .scrape.market_data import PriceStore
+from .scrape.roster import load_roster
+from .scrape.sectors import TAXONOMY_VERSION
+from .scrape.tickers import load_ticker_index, market_symbol
 
 
 logger = logging.getLogger("politracker")
@@ -18,58 +25,134 @@ def scheduled_weekly_job():
         run_full_pipeline()
 
 
-def run_full_pipeline():
+def run_full_pipeline(workers: Optional[int] = None):
     _setup_logging()
     logger.info("Starting pipeline")
 
-    new_investments = scrape_register_disclosures()
-    new_policies = scrape_hansard_updates()
+    roster = load_roster()
+    new_investments = scrape_register_disclosures(roster)
+    new_policies = scrape_hansard_updates(roster)
 
-    logger.info("Scraped %s investments", len(new_investments))
-    logger.info("Scraped %s policies", len(new_policies))
+    logger.info("Scraped %s investments", new_investments)
+    logger.info("Scraped %s policies", new_policies)
 
-    run_correlations()
+    run_correlations(workers=workers)
 
+    # Every web worker re-renders its pages on the next request
+    bump_generation()
     logger.info("Pipeline complete")
 
 
-def run_correlations():
+def run_correlations(workers: Optional[int] = None):
+    """Score investment/policy pairs added since the last run.
+
+    A pair is pending when its investment or policy is newer than the
+    watermark, or when its price window was still open at the last run.
+    """
     threshold = current_app.config.get("PRICE_GAIN_THRESHOLD", 0.15)
     window_days = current_app.config.get("CORRELATION_WINDOW_DAYS", 30)
-
-    for politician in Politician.query.all():
-        investments = Investment.query.filter_by(politician_id=politician.id).all()
-        policies = Policy.query.filter_by(politician_id=politician.id).all()
-
-        for inv in investments:
-            for pol in policies:
-                if not inv.date or not pol.date:
-                    continue
-
-                if abs((pol.date - inv.date).days) > window_days:
-                    continue
-
-                if not keyword_category_match(pol.category, inv.asset_type, inv.company):
-                    continue
-
-                price_change = get_price_change(inv.company, pol.date, pol.date + timedelta(days=window_days))
-                if price_change is None:
-                    continue
-
-                if price_change >= threshold:
-                    correlation = Correlation(
-                        politician_id=politician.id,
-                        investment_id=inv.id,
-                        policy_id=pol.id,
-                        suspicion_score=float(price_change),
-                        details=(
-                            f"Price gain {price_change:.2%} within {window_days} days of policy vote"
-                        ),
-                    )
-                    db.session.add(correlation)
+    provider = current_app.config.get("MARKET_DATA_PROVIDER", "yahoo")
+    if workers is None:
+        workers = current_app.config.get("CORRELATION_WORKERS", 1)
+    window = timedelta(days=window_days)
+
+    settings_key = f"{provider}|{threshold}|{window_days}|sectors-v{TAXONOMY_VERSION}"
+    mark = CorrelationWatermark.query.first()
+    if mark is None:
+        mark = CorrelationWatermark(settings_key=settings_key)
+        db.session.add(mark)
+    if mark.settings_key != settings_key or mark.last_run_at is None:
+        mark.settings_key = settings_key
+        mark.last_investment_id = 0
+        mark.last_policy_id = 0
+        mark.last_run_at = None
+        mark.held_runs = 0
+
+    run_started = datetime.utcnow()
+    newest_investment = db.session.query(func.max(Investment.id)).scalar() or 0
+    newest_policy = db.session.query(func.max(Policy.id)).scalar() or 0
+    open_since = mark.last_run_at.date() - window if mark.last_run_at else None
+
+    # Rows outside every sector can never match, and sector_mask is indexed
+    investments_query = Investment.query.with_entities(
+        Investment.id, Investment.politician_id, Investment.date, Investment.sector_mask, Investment.company
+    ).filter(Investment.date.isnot(None), Investment.sector_mask != 0, Investment.id <= newest_investment)
+    policies_query = Policy.query.with_entities(
+        Policy.id, Policy.politician_id, Policy.date, Policy.sector_mask
+    ).filter(Policy.date.isnot(None), Policy.sector_mask != 0, Policy.id <= newest_policy)
+    existing_query = Correlation.query.with_entities(Correlation.investment_id, Correlation.policy_id)
+    if open_since is not None:
+        politician_ids = _politicians_with_changes(mark, open_since)
+        investments_query = investments_query.filter(Investment.politician_id.in_(politician_ids))
+        policies_query = policies_query.filter(Policy.politician_id.in_(politician_ids))
+        existing_query = existing_query.filter(Correlation.politician_id.in_(politician_ids))
+    existing = {tuple(row) for row in existing_query.all()}
+
+    # company is the raw register line; only listed companies have prices
+    tickers = load_ticker_index()
+    investments = []
+    for inv_id, politician_id, inv_date, sector_mask, company in investments_query.all():
+        ticker = tickers.resolve(company)
+        if ticker:
+            investments.append(InvestmentRow(inv_id, politician_id, inv_date, sector_mask, market_symbol(ticker)))
+    policies = [PolicyRow(*row) for row in policies_query.all()]
+
+    # Fetch every symbol once, spanning the price windows of all policies
+    # within reach of its investments, before any scoring starts
+    prices = PriceStore()
+    prices.prefetch((inv.symbol, inv.date - window, inv.date + 2 * window) for inv in investments)
+    series = prices.series_for({inv.symbol for inv in investments})
+    logger.info("Loaded %s price series with %s requests", len(series), prices.requests)
+
+    settings = ScoringSettings(
+        threshold=threshold,
+        window_days=window_days,
+        as_of=provider == "alpha_vantage",
+        last_investment_id=mark.last_investment_id,
+        last_policy_id=mark.last_policy_id,
+        open_since=open_since,
+    )
+    rows = score_correlations(investments, policies, existing, series, settings, workers=workers)
+    inserted = 0
+    if rows:
+        # An overlapping run may already have stored some of these pairs
+        statement = insert_ignoring_conflicts(Correlation, ["investment_id", "policy_id"])
+        inserted = db.session.execute(statement, rows).rowcount
+    logger.info("Found %s new correlations", inserted)
+
+    # Symbols the provider did not answer for are retried on the next few runs
+    failed = prices.failed
+    retry_ids = [inv.id for inv in investments if inv.symbol in failed]
+    retry_runs = current_app.config.get("CORRELATION_PRICE_RETRY_RUNS", 3)
+    if not retry_ids:
+        mark.held_runs = 0
+    elif not prices.configured:
+        logger.error("Market data provider %s is not configured; no prices were fetched", provider)
+        mark.held_runs = 0
+    elif (mark.held_runs or 0) < retry_runs:
+        logger.warning("No prices for %s symbols; %s investments kept for the next run", len(failed), len(retry_ids))
+        newest_investment = min(newest_investment, min(retry_ids) - 1)
+        mark.held_runs = (mark.held_runs or 0) + 1
+    else:
+        logger.warning("No prices for %s symbols after %s retries; skipping their pairs", len(failed), retry_runs)
+        mark.held_runs = 0
+    mark.last_investment_id = newest_investment
+    mark.last_policy_id = newest_policy
+    mark.last_run_at = run_started
     db.session.commit()
 
 
+def _politicians_with_changes(mark: CorrelationWatermark, open_since) -> List[int]:
+    """Politicians with rows past the watermark or a policy whose window is still open."""
+    investment_ids = Investment.query.with_entities(Investment.politician_id).filter(
+        Investment.id > mark.last_investment_id
+    )
+    policy_ids = Policy.query.with_entities(Policy.politician_id).filter(
+        or_(Policy.id > mark.last_policy_id, Policy.date >= open_since)
+    )
+    return sorted({row[0] for row in investment_ids.union(policy_ids).all()})
+
+
 def _setup_logging():
     if logger.handlers:
         return
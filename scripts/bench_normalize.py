@@ -0,0 +1,86 @@
+"""Micro-benchmark for name normalization on register-style text.
+
+Uses the gzipped extracted text in instance/text_cache when a scrape has
+populated it, otherwise a synthetic corpus built from data/politicians.csv.
+"""
+import csv
+import gzip
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.scrape.utils import _normalize_name, normalize_name  # noqa: E402
+
+CSV_PATH = ROOT / "data" / "politicians.csv"
+TEXT_CACHE = ROOT / "instance" / "text_cache"
+HOLDINGS = (
+    "BHP Group Limited",
+    "Commonwealth Bank of Australia",
+    "Residential property, Canberra ACT",
+    "Self managed superannuation fund",
+    "Family trust - beneficiary",
+    "Nil",
+    "Shareholdings in public and private companies",
+)
+
+
+def legacy_normalize(value: str) -> str:
+    if not value:
+        return ""
+    value = value.lower()
+    value = re.sub(r"[^a-z\s'-]", " ", value)
+    value = re.sub(r"\b(mr|ms|mrs|dr|hon|senator|member)\b", " ", value)
+    value = re.sub(r"\s+", " ", value).strip()
+    return value
+
+
+def load_corpus():
+    lines = []
+    for path in sorted(TEXT_CACHE.glob("*.txt.gz")):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            lines.extend(line.strip() for line in f if line.strip())
+    if lines:
+        return lines, f"{len(list(TEXT_CACHE.glob('*.txt.gz')))} cached register documents"
+
+    with CSV_PATH.open("r", encoding="utf-8") as f:
+        names = [row["name"] for row in csv.DictReader(f) if row.get("name")]
+    rng = random.Random(7)
+    for name in names:
+        parts = name.split()
+        lines.append(f"FAMILY NAME {parts[-2] if parts[-1] == 'MP' else parts[-1]}")
+        lines.append(f"GIVEN NAMES {parts[1]}")
+        lines.append(f"Member: {name}")
+        for section in range(1, 15):
+            lines.append(f"{section}. Shareholdings")
+            lines.extend(rng.choice(HOLDINGS) for _ in range(rng.randint(2, 12)))
+    return lines * 5, "synthetic corpus from data/politicians.csv"
+
+
+def timed(func, lines):
+    started = time.perf_counter()
+    for line in lines:
+        func(line)
+    return time.perf_counter() - started
+
+
+def main():
+    lines, source = load_corpus()
+    print(f"{len(lines)} lines, {len(set(lines))} distinct ({source})")
+
+    legacy = timed(legacy_normalize, lines)
+    _normalize_name.cache_clear()
+    current = timed(normalize_name, lines)
+    info = _normalize_name.cache_info()
+
+    print(f"legacy three re.sub: {legacy * 1000:8.1f} ms")
+    print(f"normalize_name:      {current * 1000:8.1f} ms  ({legacy / current:.1f}x)")
+    print(f"memo hits {info.hits}, misses {info.misses}, size {info.currsize}/{info.maxsize}")
+
+
+if __name__ == "__main__":
+    main()
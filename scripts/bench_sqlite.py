@@ -0,0 +1,209 @@
+"""Before/after benchmark for the SQLite storage profile and secondary indexes.
+
+Builds the same synthetic database three times in a temporary directory, about
+1M rows spread over investments, policies and correlations:
+
+  before   stock pragmas, schema without the secondary indexes
+  pragmas  app/storage.py pragmas, schema without the secondary indexes
+  after    app/storage.py pragmas, schema with migrations.SECONDARY_INDEXES
+
+then times the batched inserts and the per-politician queries the
+correlation run, the profile page and the static export make.
+
+    python scripts/bench_sqlite.py [--rows 1000000]
+"""
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import create_engine  # noqa: E402
+from app import db  # noqa: E402
+from app import models  # noqa: E402,F401
+from app.config import Config  # noqa: E402
+from app.migrations import SECONDARY_INDEXES  # noqa: E402
+from app.storage import apply_sqlite_pragmas, sqlite_pragmas  # noqa: E402
+
+POLITICIANS = 250
+BATCH_SIZE = 500
+LOOKUPS = 300
+BASE_DATE = date(2015, 1, 1)
+ASSETS = ("equity", "property", "trust", "fixed income", "declared asset")
+CATEGORIES = ("mining", "energy", "banking", "property", "other")
+
+
+def create_schema(path: Path, with_indexes: bool):
+    engine = create_engine(f"sqlite:///{path}")
+    db.metadata.create_all(engine)
+    engine.dispose()
+    if not with_indexes:
+        conn = sqlite3.connect(path)
+        for name, _, _ in SECONDARY_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        conn.close()
+
+
+def connect(path: Path, tuned: bool) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    if tuned:
+        config = {name: getattr(Config, name) for name in ("SQLITE_MMAP_SIZE", "SQLITE_CACHE_SIZE_KB")}
+        apply_sqlite_pragmas(conn, sqlite_pragmas(config))
+    return conn
+
+
+def insert_batches(conn, sql, rows):
+    # Same shape as scrape.ingest.BulkWriter: executemany plus a commit per batch
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.executemany(sql, batch)
+            conn.commit()
+            batch = []
+    if batch:
+        conn.executemany(sql, batch)
+        conn.commit()
+
+
+def populate(conn, total_rows: int, seed: int):
+    rng = random.Random(seed)
+    n_investments = total_rows // 2
+    n_policies = total_rows * 2 // 5
+    n_correlations = total_rows - n_investments - n_policies
+    now = datetime(2024, 1, 1)
+
+    def day():
+        return (BASE_DATE + timedelta(days=rng.randint(0, 3650))).isoformat()
+
+    insert_batches(
+        conn,
+        "INSERT INTO politicians (id, name, chamber) VALUES (?, ?, ?)",
+        ((i, f"Member {i}", "House" if i % 3 else "Senate") for i in range(1, POLITICIANS + 1)),
+    )
+    insert_batches(
+        conn,
+        "INSERT INTO investments (politician_id, asset_type, company, date, source_hash, sector_mask, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            (rng.randint(1, POLITICIANS), rng.choice(ASSETS), f"Company {rng.randint(1, 5000)}", day(),
+             f"i{i:012d}", rng.choice((0, 0, 1, 2, 4, 8)), now.isoformat(sep=" "))
+            for i in range(n_investments)
+        ),
+    )
+    insert_batches(
+        conn,
+        "INSERT INTO policies (politician_id, bill_name, date, category, source_hash, sector_mask, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            (rng.randint(1, POLITICIANS), f"Bill {i}", day(), rng.choice(CATEGORIES), f"p{i:012d}",
+             rng.choice((0, 1, 2, 4, 8)), now.isoformat(sep=" "))
+            for i in range(n_policies)
+        ),
+    )
+    pairs = set()
+    while len(pairs) < n_correlations:
+        pairs.add((rng.randint(1, n_investments), rng.randint(1, n_policies)))
+    insert_batches(
+        conn,
+        "INSERT INTO correlations (politician_id, investment_id, policy_id, suspicion_score, details, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (rng.randint(1, POLITICIANS), inv_id, pol_id, rng.random(), "Price gain",
+             (now - timedelta(minutes=n)).isoformat(sep=" "))
+            for n, (inv_id, pol_id) in enumerate(sorted(pairs))
+        ),
+    )
+
+
+def query_workload(conn, seed: int) -> dict:
+    rng = random.Random(seed)
+    ids = [rng.randint(1, POLITICIANS) for _ in range(LOOKUPS)]
+    timings = {}
+
+    def timed(label, func):
+        started = time.perf_counter()
+        func()
+        timings[label] = time.perf_counter() - started
+
+    def profile_pages():
+        for pol_id in ids:
+            conn.execute("SELECT * FROM investments WHERE politician_id = ? ORDER BY date DESC", (pol_id,)).fetchall()
+            conn.execute("SELECT * FROM policies WHERE politician_id = ? ORDER BY date DESC", (pol_id,)).fetchall()
+            conn.execute(
+                "SELECT * FROM correlations WHERE politician_id = ? ORDER BY created_at DESC", (pol_id,)
+            ).fetchall()
+
+    def correlation_load():
+        chunk = sorted(set(ids[:40]))
+        marks = ", ".join("?" for _ in chunk)
+        conn.execute(
+            "SELECT id, politician_id, date, sector_mask, company FROM investments "
+            f"WHERE date IS NOT NULL AND sector_mask != 0 AND politician_id IN ({marks})",
+            chunk,
+        ).fetchall()
+        conn.execute(
+            "SELECT id, politician_id, date, sector_mask FROM policies "
+            f"WHERE date IS NOT NULL AND sector_mask != 0 AND politician_id IN ({marks})",
+            chunk,
+        ).fetchall()
+
+    def policy_cascade():
+        for pol_id in ids:
+            conn.execute("SELECT id FROM correlations WHERE policy_id = ?", (pol_id * 97,)).fetchall()
+
+    def export_join():
+        conn.execute(
+            "SELECT c.politician_id, c.details, i.company, i.asset_type, p.bill_name FROM correlations c "
+            "JOIN investments i ON c.investment_id = i.id JOIN policies p ON c.policy_id = p.id"
+        ).fetchall()
+
+    timed(f"profile pages ({LOOKUPS} politicians)", profile_pages)
+    timed("correlation load (40 politicians)", correlation_load)
+    timed(f"correlations by policy ({LOOKUPS})", policy_cascade)
+    timed("export correlation join", export_join)
+    return timings
+
+
+PROFILES = (("before", False, False), ("pragmas", True, False), ("after", True, True))
+
+
+def run_profile(workdir: Path, name: str, tuned: bool, indexed: bool, total_rows: int) -> dict:
+    path = workdir / f"{name}.db"
+    create_schema(path, with_indexes=indexed)
+    conn = connect(path, tuned)
+    started = time.perf_counter()
+    populate(conn, total_rows, seed=1)
+    timings = {f"insert {total_rows} rows": time.perf_counter() - started}
+    conn.execute("ANALYZE")
+    timings.update(query_workload(conn, seed=2))
+    conn.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, tuned, indexed in PROFILES:
+            results[name] = run_profile(Path(tmp), name, tuned, indexed, args.rows)
+
+    before = results["before"]
+    width = max(len(label) for label in before)
+    print(f"{'':{width}}" + "".join(f"  {name:>10}" for name in results))
+    for label, seconds in before.items():
+        cells = "".join(f"  {results[name][label] * 1000:8.0f}ms" for name in results)
+        print(f"{label:{width}}{cells}  ({seconds / results['after'][label]:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
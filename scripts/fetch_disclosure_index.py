@@ -1,5 +1,6 @@
 import json
 import re
+import sys
 import time
 from datetime import datetime, timezone
 from pathlib import Path
@@ -9,6 +10,10 @@ import requests
 from bs4 import BeautifulSoup
 
 ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.scrape.session import get_session  # noqa: E402
+
 OUT_DISCLOSURES = ROOT / "docs" / "data" / "disclosures.json"
 
 HOUSE_URL = "https://www.aph.gov.au/Senators_and_Members/Members/Register"
@@ -27,7 +32,7 @@ def fetch_html(url: str, retries: int = 3, backoff: float = 1.5) -> str:
     last_err = None
     for attempt in range(1, retries + 1):
         try:
-            resp = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=30)
+            resp = get_session().get(url, headers={"User-Agent": USER_AGENT}, timeout=30)
             resp.raise_for_status()
             return resp.text
         except requests.RequestException as exc:
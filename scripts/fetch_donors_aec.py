@@ -2,12 +2,16 @@ import csv
 import io
 import json
 import re
+import sys
 import zipfile
 from datetime import datetime, timezone
 from pathlib import Path
-import requests
 
 ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.scrape.session import get_session  # noqa: E402
+
 OUT_DONORS = ROOT / "docs" / "data" / "donors.json"
 
 AEC_ZIP_URL = "https://transparency.aec.gov.au/Download/AllAnnualData"
@@ -25,7 +29,7 @@ def parse_fin_year(value: str) -> int:
 
 
 def load_zip() -> zipfile.ZipFile:
-    resp = requests.get(AEC_ZIP_URL, headers={"User-Agent": USER_AGENT}, timeout=30)
+    resp = get_session().get(AEC_ZIP_URL, headers={"User-Agent": USER_AGENT}, timeout=30)
     resp.raise_for_status()
     return zipfile.ZipFile(io.BytesIO(resp.content))
 
@@ -1,11 +1,15 @@
 import csv
+import sys
 import time
 from pathlib import Path
 from typing import List, Dict
-import requests
 from bs4 import BeautifulSoup
 
 ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.scrape.session import get_session  # noqa: E402
+
 OUT_CSV = ROOT / "data" / "politicians.csv"
 
 USER_AGENT = "PolywatchBot/1.0 (public data for transparency)"
@@ -29,7 +33,7 @@ def fetch_html(url: str) -> str:
         "Upgrade-Insecure-Requests": "1",
         "Referer": "https://www.aph.gov.au/",
     }
-    resp = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+    resp = get_session().get(url, headers=headers, timeout=REQUEST_TIMEOUT)
     resp.raise_for_status()
     return resp.text
 